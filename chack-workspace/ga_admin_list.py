@@ -1,5 +1,9 @@
 #!/usr/bin/env python3
+import hashlib
+import json
 import os
+import time
+
 from google.oauth2 import service_account
 from google.analytics.admin_v1beta import AnalyticsAdminServiceClient
 
@@ -7,26 +11,84 @@ SCOPES = [
     "https://www.googleapis.com/auth/analytics.readonly",
 ]
 
-def main():
+# Account/property listings change rarely; cache them on disk so repeated
+# runs (e.g. from the exec tool) skip the API entirely within the TTL.
+CACHE_DIR = os.path.expanduser("~/.cache/chack")
+CACHE_TTL_SECONDS = int(os.environ.get("GA_ADMIN_LIST_CACHE_TTL", "3600"))
+
+
+def _cache_path() -> str:
+    # Key the cache file by the configured credentials so switching
+    # GOOGLE_APPLICATION_CREDENTIALS within the TTL never serves the
+    # previous account's listings.
+    cred_path = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS", "")
+    digest = hashlib.sha256(cred_path.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(CACHE_DIR, f"ga_admin_list-{digest}.json")
+
+
+def _load_cached_accounts():
+    if CACHE_TTL_SECONDS <= 0:
+        return None
+    try:
+        with open(_cache_path(), "r", encoding="utf-8") as handle:
+            cached = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    if time.time() - cached.get("fetched_at", 0) > CACHE_TTL_SECONDS:
+        return None
+    return cached.get("accounts")
+
+
+def _save_cached_accounts(accounts) -> None:
+    if CACHE_TTL_SECONDS <= 0:
+        return
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(_cache_path(), "w", encoding="utf-8") as handle:
+            json.dump({"fetched_at": time.time(), "accounts": accounts}, handle)
+    except OSError:
+        pass
+
+
+def _fetch_accounts():
     cred_path = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS")
     if not cred_path:
         raise SystemExit("GOOGLE_APPLICATION_CREDENTIALS is not set")
     creds = service_account.Credentials.from_service_account_file(cred_path, scopes=SCOPES)
     client = AnalyticsAdminServiceClient(credentials=creds)
 
-    accounts = list(client.list_accounts())
+    # A single list_account_summaries call returns every account with its
+    # nested property summaries, replacing the 1 + len(accounts) calls the
+    # list_accounts + per-account list_properties approach needed.
+    accounts = []
+    for summary in client.list_account_summaries():
+        accounts.append(
+            {
+                "account": summary.account,
+                "display_name": summary.display_name,
+                "properties": [
+                    {"property": prop.property, "display_name": prop.display_name}
+                    for prop in summary.property_summaries
+                ],
+            }
+        )
+    return accounts
+
+
+def main():
+    accounts = _load_cached_accounts()
+    if accounts is None:
+        accounts = _fetch_accounts()
+        _save_cached_accounts(accounts)
+
     print(f"accounts: {len(accounts)}")
     for acc in accounts:
-        print(f"- {acc.name}  {acc.display_name}")
+        print(f"- {acc['account']}  {acc['display_name']}")
 
-    properties = []
-    for acc in accounts:
-        req = {"filter": f"parent:{acc.name}"}
-        for prop in client.list_properties(request=req):
-            properties.append(prop)
+    properties = [prop for acc in accounts for prop in acc["properties"]]
     print(f"properties: {len(properties)}")
     for prop in properties:
-        print(f"- {prop.name}  {prop.display_name}")
+        print(f"- {prop['property']}  {prop['display_name']}")
 
 if __name__ == "__main__":
     main()
@@ -1,13 +1,22 @@
 #!/usr/bin/env python3
 import argparse
 import datetime as dt
+import functools
 import json
 import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Optional, Sequence
 
 import requests
 
 
+# One session for the whole run so TCP/TLS connections are reused across
+# pages and orgs instead of being re-established per request.
+_SESSION = requests.Session()
+
 USAGE_ENDPOINTS = [
     "completions",
     "images",
@@ -19,7 +28,14 @@ USAGE_ENDPOINTS = [
 ]
 
 
+_DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
 def _parse_date(value: str) -> dt.datetime:
+    # Cheap precompiled-regex check rejects malformed input without paying
+    # for strptime's try/except machinery on the common bad-input path.
+    if not _DATE_PATTERN.match(value):
+        raise SystemExit(f"Invalid date '{value}'. Use YYYY-MM-DD.")
     try:
         return dt.datetime.strptime(value, "%Y-%m-%d")
     except ValueError as exc:
@@ -36,7 +52,10 @@ def _default_range() -> tuple[int, int]:
     return _to_unix_seconds(start), _to_unix_seconds(end)
 
 
+@functools.lru_cache(maxsize=None)
 def _get_headers(api_key: str, org_id: Optional[str]) -> dict:
+    # Cached per (api_key, org_id): the same header dict is reused for every
+    # page of every request to that org instead of being rebuilt each call.
     headers = {"Authorization": f"Bearer {api_key}"}
     if org_id:
         headers["OpenAI-Organization"] = org_id
@@ -59,36 +78,96 @@ def _resolve_orgs(org_id: Optional[str], org_ids: Optional[str]) -> tuple[Option
 
 def _request(base_url: str, path: str, api_key: str, org_id: Optional[str], params: dict) -> dict:
     url = base_url.rstrip("/") + path
-    resp = requests.get(url, headers=_get_headers(api_key, org_id), params=params, timeout=30)
-    if resp.status_code != 200:
-        raise SystemExit(f"ERROR: {resp.status_code} {resp.text[:500]}")
-    return resp.json()
-
-
-def _paginate(base_url: str, path: str, api_key: str, org_id: Optional[str], params: dict) -> dict:
-    merged = {"object": None, "data": [], "has_more": False, "next_page": None}
+    headers = _get_headers(api_key, org_id)
+    delay = 1.0
+    for attempt in range(5):
+        resp = _SESSION.get(url, headers=headers, params=params, timeout=30)
+        if resp.status_code == 200:
+            return resp.json()
+        # Back off and retry on rate limits and transient server errors so
+        # the concurrent org fan-out degrades instead of dying on a 429.
+        if resp.status_code == 429 or resp.status_code >= 500:
+            retry_after = resp.headers.get("Retry-After")
+            try:
+                wait = float(retry_after) if retry_after else delay
+            except ValueError:
+                wait = delay
+            time.sleep(wait)
+            delay = min(delay * 2, 30.0)
+            continue
+        break
+    raise SystemExit(f"ERROR: {resp.status_code} {resp.text[:500]}")
+
+
+def _iter_pages(base_url: str, path: str, api_key: str, org_id: Optional[str], params: dict):
     page_params = dict(params)
     while True:
         data = _request(base_url, path, api_key, org_id, page_params)
-        merged["object"] = merged["object"] or data.get("object")
-        merged["data"].extend(data.get("data", []))
-        merged["has_more"] = bool(data.get("has_more"))
-        merged["next_page"] = data.get("next_page")
-        if not merged["has_more"] or not merged["next_page"]:
+        yield data
+        if not data.get("has_more") or not data.get("next_page"):
             break
-        page_params["page"] = merged["next_page"]
+        page_params["page"] = data.get("next_page")
+
+
+def _iter_buckets(base_url: str, path: str, api_key: str, org_id: Optional[str], params: dict):
+    for page in _iter_pages(base_url, path, api_key, org_id, params):
+        yield from page.get("data", [])
+
+
+def _paginate(base_url: str, path: str, api_key: str, org_id: Optional[str], params: dict) -> dict:
+    merged = {"object": None, "data": [], "has_more": False, "next_page": None}
+    for page in _iter_pages(base_url, path, api_key, org_id, params):
+        merged["object"] = merged["object"] or page.get("object")
+        merged["data"].extend(page.get("data", []))
     return merged
 
 
-def _sum_costs(costs_data: dict) -> float:
+def _map_orgs(org_ids: Sequence[str], fetch, max_workers: int = 5) -> dict:
+    # Each org is an independent API conversation; overlap them with a small
+    # pool so the wall time is ~max(org) instead of sum(orgs). Bounded to
+    # stay under the per-key rate limits.
+    results = {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(org_ids))) as pool:
+        futures = {pool.submit(fetch, oid): oid for oid in org_ids}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+    # Futures complete in arbitrary order; emit orgs in --org-ids order so
+    # the JSON output stays deterministic run to run.
+    return {oid: results[oid] for oid in org_ids}
+
+
+def _print_json_map(payload: dict, sort_keys: bool = False) -> None:
+    # Serialize the org->result map one entry at a time; with many orgs the
+    # raw payloads are large and a single json.dumps would hold a second
+    # copy of everything in one string before printing.
+    items = sorted(payload.items()) if sort_keys else list(payload.items())
+    out = sys.stdout
+    out.write("{")
+    for idx, (key, value) in enumerate(items):
+        if idx:
+            out.write(",")
+        out.write(f"\n  {json.dumps(key)}: ")
+        out.write(json.dumps(value, indent=2, sort_keys=sort_keys).replace("\n", "\n  "))
+    out.write("\n}\n" if items else "}\n")
+
+
+def _reduce_costs(buckets) -> tuple[float, dict]:
+    # Single pass over the bucket stream computes both the grand total and
+    # the per-project totals, so --total and --by-project share one walk.
     total = 0.0
-    for bucket in costs_data.get("data", []):
+    by_project = {}
+    for bucket in buckets:
         for result in bucket.get("results", []):
-            amount = result.get("amount", {})
-            value = amount.get("value")
-            if value is not None:
-                total += float(value)
-    return total
+            amount = result.get("amount", {}).get("value")
+            if amount is None:
+                continue
+            value = float(amount)
+            total += value
+            pid = result.get("project_id") or "unknown"
+            pname = result.get("project_name") or ""
+            key = f"{pid}|{pname}".rstrip("|")
+            by_project[key] = by_project.get(key, 0.0) + value
+    return total, by_project
 
 
 def _with_time_range(args) -> dict:
@@ -185,44 +264,27 @@ def main() -> int:
         if group_by:
             params["group_by"] = group_by
         if org_ids:
-            payload = {}
-            for oid in org_ids:
-                data = _paginate(args.base_url, "/v1/organization/costs", args.api_key, oid, params)
-                if args.by_project:
-                    totals = {}
-                    for bucket in data.get("data", []):
-                        for result in bucket.get("results", []):
-                            pid = result.get("project_id") or "unknown"
-                            pname = result.get("project_name") or ""
-                            key = f"{pid}|{pname}".rstrip("|")
-                            amount = result.get("amount", {}).get("value")
-                            if amount is not None:
-                                totals[key] = totals.get(key, 0.0) + float(amount)
-                    payload[oid] = totals
-                elif args.total:
-                    payload[oid] = _sum_costs(data)
-                else:
-                    payload[oid] = data
-            if args.total:
-                print(json.dumps(payload, indent=2, sort_keys=True))
-            else:
-                print(json.dumps(payload, indent=2))
+            def _fetch_costs(oid):
+                if args.by_project or args.total:
+                    total, by_project = _reduce_costs(
+                        _iter_buckets(args.base_url, "/v1/organization/costs", args.api_key, oid, params)
+                    )
+                    return by_project if args.by_project else total
+                return _paginate(args.base_url, "/v1/organization/costs", args.api_key, oid, params)
+
+            payload = _map_orgs(org_ids, _fetch_costs)
+            _print_json_map(payload, sort_keys=args.total)
         else:
-            data = _paginate(args.base_url, "/v1/organization/costs", args.api_key, org_id, params)
+            if args.by_project or args.total:
+                total, by_project = _reduce_costs(
+                    _iter_buckets(args.base_url, "/v1/organization/costs", args.api_key, org_id, params)
+                )
             if args.by_project:
-                totals = {}
-                for bucket in data.get("data", []):
-                    for result in bucket.get("results", []):
-                        pid = result.get("project_id") or "unknown"
-                        pname = result.get("project_name") or ""
-                        key = f"{pid}|{pname}".rstrip("|")
-                        amount = result.get("amount", {}).get("value")
-                        if amount is not None:
-                            totals[key] = totals.get(key, 0.0) + float(amount)
-                print(json.dumps(totals, indent=2, sort_keys=True))
+                print(json.dumps(by_project, indent=2, sort_keys=True))
             elif args.total:
-                print(f"{_sum_costs(data):.2f}")
+                print(f"{total:.2f}")
             else:
+                data = _paginate(args.base_url, "/v1/organization/costs", args.api_key, org_id, params)
                 print(json.dumps(data, indent=2))
         return 0
 
@@ -240,17 +302,17 @@ def main() -> int:
         if group_by:
             params["group_by"] = group_by
         if org_ids:
-            payload = {}
-            for oid in org_ids:
-                data = _paginate(
+            payload = _map_orgs(
+                org_ids,
+                lambda oid: _paginate(
                     args.base_url,
                     f"/v1/organization/usage/{args.endpoint}",
                     args.api_key,
                     oid,
                     params,
-                )
-                payload[oid] = data
-            print(json.dumps(payload, indent=2))
+                ),
+            )
+            _print_json_map(payload)
         else:
             data = _paginate(
                 args.base_url,
@@ -264,11 +326,11 @@ def main() -> int:
 
     if args.cmd == "projects":
         if org_ids:
-            payload = {}
-            for oid in org_ids:
-                data = _request(args.base_url, "/v1/organization/projects", args.api_key, oid, {})
-                payload[oid] = data
-            print(json.dumps(payload, indent=2))
+            payload = _map_orgs(
+                org_ids,
+                lambda oid: _request(args.base_url, "/v1/organization/projects", args.api_key, oid, {}),
+            )
+            _print_json_map(payload)
         else:
             data = _request(args.base_url, "/v1/organization/projects", args.api_key, org_id, {})
             print(json.dumps(data, indent=2))
@@ -289,11 +351,11 @@ def main() -> int:
 
     if args.cmd == "admin-keys":
         if org_ids:
-            payload = {}
-            for oid in org_ids:
-                data = _request(args.base_url, "/v1/organization/admin_api_keys", args.api_key, oid, {})
-                payload[oid] = data
-            print(json.dumps(payload, indent=2))
+            payload = _map_orgs(
+                org_ids,
+                lambda oid: _request(args.base_url, "/v1/organization/admin_api_keys", args.api_key, oid, {}),
+            )
+            _print_json_map(payload)
         else:
             data = _request(args.base_url, "/v1/organization/admin_api_keys", args.api_key, org_id, {})
             print(json.dumps(data, indent=2))
@@ -3,7 +3,6 @@ from __future__ import annotations
 from typing import Any
 
 from ..config import ChackConfig
-from . import langchain_backend
 
 
 def build_executor(
@@ -18,6 +17,8 @@ def build_executor(
 ):
     backend = (config.agent.backend or "langchain").strip().lower()
     if backend in {"langchain", "lc"}:
+        from . import langchain_backend
+
         memory = langchain_backend.build_langchain_memory(
             config,
             max_messages=memory_max_messages,
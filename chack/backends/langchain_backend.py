@@ -11,12 +11,40 @@ except ImportError:  # pragma: no cover - fallback for newer langchain layouts
     except ImportError:
         from langchain.agents import create_openai_tools_agent
     from langchain.agents.agent import AgentExecutor
-from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain.memory import ConversationSummaryBufferMemory
+from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder, PromptTemplate
 from langchain_openai import ChatOpenAI
 
-from ..config import ChackConfig
+from ..config import ChackConfig, resolve_model
 from ..tools.toolset import Toolset
-from ..memory import build_memory
+
+
+# Executors are rebuilt per chat (and again on memory resets), but the tools
+# only depend on the tools config, which lives for the whole process. Build
+# the Toolset once per config object and reuse it across rebuilds.
+_TOOLSETS: dict[int, Toolset] = {}
+
+
+# ChatOpenAI clients are stateless per (model, temperature); share them
+# across executor and memory rebuilds instead of constructing new ones.
+_LLM_CACHE: dict[tuple, ChatOpenAI] = {}
+
+
+def _get_llm(model_name: str, temperature: float) -> ChatOpenAI:
+    key = (model_name, temperature)
+    llm = _LLM_CACHE.get(key)
+    if llm is None:
+        llm = ChatOpenAI(model=model_name, temperature=temperature)
+        _LLM_CACHE[key] = llm
+    return llm
+
+
+def _get_toolset(tools_config) -> Toolset:
+    toolset = _TOOLSETS.get(id(tools_config))
+    if toolset is None:
+        toolset = Toolset(tools_config)
+        _TOOLSETS[id(tools_config)] = toolset
+    return toolset
 
 
 @dataclass
@@ -26,6 +54,9 @@ class LangchainExecutor:
     def invoke(self, payload: dict[str, Any]) -> dict[str, Any]:
         return self.executor.invoke(payload)
 
+    async def ainvoke(self, payload: dict[str, Any]) -> dict[str, Any]:
+        return await self.executor.ainvoke(payload)
+
     async def aget_memory_messages(self) -> list[Any]:
         if not getattr(self.executor, "memory", None):
             return []
@@ -39,16 +70,10 @@ def build_executor(
     memory=None,
     max_iterations: int = 50,
 ) -> LangchainExecutor:
-    model_name = config.model.chat or config.model.primary
-    temperature = config.model.temperature
-    if "chat" in model_name:
-        temperature = 1.0
-    llm = ChatOpenAI(
-        model=model_name,
-        temperature=temperature,
-    )
+    model_name, temperature = resolve_model(config)
+    llm = _get_llm(model_name, temperature)
 
-    toolset = Toolset(config.tools)
+    toolset = _get_toolset(config.tools)
 
     prompt = ChatPromptTemplate.from_messages(
         [
@@ -72,15 +97,78 @@ def build_executor(
     return LangchainExecutor(executor=executor)
 
 
+def _message_counter(value) -> int:
+    if isinstance(value, list):
+        return len(value)
+    # Count lines without materializing the list splitlines() would build.
+    text = str(value)
+    if not text:
+        return 0
+    return text.count("\n") + (0 if text.endswith("\n") else 1)
+
+
+class _SafeSummaryBufferMemory(ConversationSummaryBufferMemory):
+    trigger_limit: int = 0
+    target_limit: int = 0
+
+    def _take_pruned(self) -> list:
+        # The buffer is a langchain-owned list, so pop(0) in a loop would
+        # shift the whole list on every removal. Slice the overflow off in
+        # one delete instead.
+        buffer = self.chat_memory.messages
+        if _message_counter(buffer) <= self.trigger_limit:
+            return []
+        excess = max(len(buffer) - self.target_limit, 0)
+        pruned_memory = buffer[:excess]
+        del buffer[:excess]
+        return pruned_memory
+
+    def prune(self) -> None:
+        pruned_memory = self._take_pruned()
+        if pruned_memory:
+            self.moving_summary_buffer = self.predict_new_summary(
+                pruned_memory,
+                self.moving_summary_buffer,
+            )
+
+    async def aprune(self) -> None:
+        pruned_memory = self._take_pruned()
+        if pruned_memory:
+            self.moving_summary_buffer = await self.apredict_new_summary(
+                pruned_memory,
+                self.moving_summary_buffer,
+            )
+
+
 def build_langchain_memory(
     config: ChackConfig,
     max_messages: int | None = None,
     reset_to_messages: int | None = None,
     summary_prompt: str | None = None,
-):
-    return build_memory(
-        config,
-        max_messages=max_messages,
-        reset_to_messages=reset_to_messages,
-        summary_prompt=summary_prompt,
-    )
+) -> ConversationSummaryBufferMemory:
+    # Limits arrive pre-clamped by load_config; only fill in defaults here.
+    if max_messages is None:
+        max_messages = config.telegram.memory_max_messages
+    if reset_to_messages is None:
+        reset_to_messages = max_messages
+
+    prompt = None
+    if summary_prompt:
+        prompt = PromptTemplate.from_template(summary_prompt)
+
+    model_name, temperature = resolve_model(config, temperature=0.0)
+    summary_llm = _get_llm(model_name, temperature)
+
+    memory_kwargs = {
+        "llm": summary_llm,
+        "max_token_limit": max_messages,
+        "token_counter": _message_counter,
+        "return_messages": True,
+        "memory_key": "chat_history",
+        "output_key": "output",
+        "trigger_limit": max_messages,
+        "target_limit": reset_to_messages,
+    }
+    if prompt is not None:
+        memory_kwargs["prompt"] = prompt
+    return _SafeSummaryBufferMemory(**memory_kwargs)
@@ -1,13 +1,14 @@
 from __future__ import annotations
 
+from collections import deque
 from dataclasses import dataclass
 from typing import Any, Optional
 
 from agents import Agent, ModelSettings, Runner
 from agents.items import ToolCallItem
 
-from ..config import ChackConfig
-from ..long_term_memory import build_long_term_memory, build_memory_summary, format_messages
+from ..config import ChackConfig, resolve_model
+from ..long_term_memory import abuild_memory_summary, build_memory_summary
 from ..tools.agents_toolset import AgentsToolset
 
 
@@ -22,85 +23,147 @@ class AgentsExecutor:
     _config: ChackConfig
     agent: Agent
     max_turns: int
-    _transcript: list[dict[str, Any]]
+    _transcript: deque[dict[str, Any]]
+    # Pre-formatted "role: content" line per transcript entry, maintained
+    # incrementally on append so trims join the evicted lines instead of
+    # re-walking the message dicts through format_messages.
+    _transcript_lines: deque[str]
+    # Evicted lines awaiting summarization. Normally consumed by the same
+    # trim that produced them, but kept around if the summary call fails so
+    # several trims' worth can be folded into one LLM call later.
+    _pending_summary_lines: list[str]
     _memory_limit: int
     _memory_reset_to: int
     _summary_text: str
     _summary_max_chars: int
     _memory_summary_prompt: str
     _base_system_prompt: str
-
-    def invoke(self, payload: dict[str, Any]) -> dict[str, Any]:
-        user_input = payload.get("input", "")
+    _summary_prefix: str
+    _instructions: str
+    _instructions_summary: str
+
+    def _sync_instructions(self) -> None:
+        # Rebuild and reassign the composed prompt only when the summary
+        # changed; on unchanged turns the agent keeps its current string.
+        if self._summary_text == self._instructions_summary:
+            return
         if self._summary_text:
-            self.agent.instructions = (
-                f"{self._base_system_prompt}\n\n### MEMORY SUMMARY\n{self._summary_text}"
-            )
+            self._instructions = self._summary_prefix + self._summary_text
         else:
-            self.agent.instructions = self._base_system_prompt
-        input_items = list(self._transcript)
-        if user_input:
-            input_items.append({"role": "user", "content": user_input})
-        result = Runner.run_sync(
-            self.agent,
-            input_items,
-            max_turns=self.max_turns,
-        )
-        output = result.final_output or ""
+            self._instructions = self._base_system_prompt
+        self._instructions_summary = self._summary_text
+        self.agent.instructions = self._instructions
+
+    def _start_turn(self, payload: dict[str, Any]) -> list[dict[str, Any]]:
+        user_input = payload.get("input", "")
+        self._sync_instructions()
         if user_input:
             self._transcript.append({"role": "user", "content": user_input})
+            self._transcript_lines.append(f"user: {user_input}")
+        # Append first, then materialize the transcript once for the SDK
+        # call; the old copy-then-append built the user message dict twice.
+        return list(self._transcript)
+
+    def _finish_turn(self, result) -> dict[str, Any]:
+        output = result.final_output or ""
         if output:
             self._transcript.append({"role": "assistant", "content": output})
-        if self._memory_limit:
-            if len(self._transcript) > self._memory_limit:
-                reset_to = self._memory_reset_to or self._memory_limit
-                if reset_to > self._memory_limit:
-                    reset_to = self._memory_limit
-                if reset_to < 1:
-                    reset_to = 1
-                removed = self._transcript[:-reset_to]
-                self._transcript = self._transcript[-reset_to:]
-                if removed:
-                    conversation = format_messages(removed)
-                    self._summary_text = build_memory_summary(
-                        self._config,
-                        self._memory_summary_prompt,
-                        conversation,
-                        self._summary_text,
-                        self._summary_max_chars,
-                    )
-        steps = _extract_tool_steps(result.new_items)
+            self._transcript_lines.append(f"assistant: {output}")
         return {
             "output": output,
-            "intermediate_steps": steps,
+            "intermediate_steps": _extract_tool_steps(result.new_items),
             "raw_result": result,
         }
 
+    def invoke(self, payload: dict[str, Any]) -> dict[str, Any]:
+        messages = self._start_turn(payload)
+        result = Runner.run_sync(self.agent, messages, max_turns=self.max_turns)
+        response = self._finish_turn(result)
+        self._trim_transcript()
+        return response
+
+    async def ainvoke(self, payload: dict[str, Any]) -> dict[str, Any]:
+        # Same turn as invoke, but awaiting Runner.run on the adapter's own
+        # event loop instead of letting run_sync spin up a throwaway one in
+        # a worker thread.
+        messages = self._start_turn(payload)
+        result = await Runner.run(self.agent, messages, max_turns=self.max_turns)
+        response = self._finish_turn(result)
+        await self._atrim_transcript()
+        return response
+
+    def _evict_overflow(self) -> str:
+        # O(removed) popleft trimming; evicted messages are folded into the
+        # running summary instead of being dropped, which is why the deque
+        # has no maxlen. Returns the conversation text awaiting summary, or
+        # "" when the transcript is within limits.
+        if not self._memory_limit or len(self._transcript) <= self._memory_limit:
+            return ""
+        reset_to = self._memory_reset_to or self._memory_limit
+        if reset_to > self._memory_limit:
+            reset_to = self._memory_limit
+        if reset_to < 1:
+            reset_to = 1
+        while len(self._transcript) > reset_to:
+            self._transcript.popleft()
+            self._pending_summary_lines.append(self._transcript_lines.popleft())
+        if not self._pending_summary_lines:
+            return ""
+        return "\n".join(self._pending_summary_lines).strip()
+
+    def _trim_transcript(self) -> None:
+        conversation = self._evict_overflow()
+        if conversation:
+            # One summary call covers everything pending; the lines are only
+            # dropped once the call succeeds, so a failed call just defers
+            # them to the next trim instead of losing them.
+            self._summary_text = build_memory_summary(
+                self._config,
+                self._memory_summary_prompt,
+                conversation,
+                self._summary_text,
+                self._summary_max_chars,
+            )
+            self._pending_summary_lines.clear()
+
+    async def _atrim_transcript(self) -> None:
+        conversation = self._evict_overflow()
+        if conversation:
+            self._summary_text = await abuild_memory_summary(
+                self._config,
+                self._memory_summary_prompt,
+                conversation,
+                self._summary_text,
+                self._summary_max_chars,
+            )
+            self._pending_summary_lines.clear()
+
     async def aget_memory_messages(self) -> list[Any]:
         return list(self._transcript)
 
 
 def _extract_tool_steps(items: list[Any]) -> list[tuple[ToolAction, Any]]:
-    steps: list[tuple[ToolAction, Any]] = []
-    for item in items:
-        if not isinstance(item, ToolCallItem):
-            continue
-        raw = item.raw_item
-        tool_name = _get_tool_name(raw) or "tool"
-        tool_input = _get_tool_input(raw)
-        steps.append((ToolAction(tool=tool_name, tool_input=tool_input), None))
-    return steps
+    return [
+        (
+            ToolAction(
+                tool=_get_tool_name(item.raw_item) or "tool",
+                tool_input=_get_tool_input(item.raw_item),
+            ),
+            None,
+        )
+        for item in items
+        if isinstance(item, ToolCallItem)
+    ]
+
+
+# Sentinel so a present-but-None attribute is distinguishable from a missing
+# one with a single getattr instead of paired hasattr/getattr lookups.
+_MISSING = object()
 
 
 def _get_tool_name(raw: Any) -> Optional[str]:
     if raw is None:
         return None
-    if hasattr(raw, "name"):
-        return getattr(raw, "name", None)
-    if hasattr(raw, "function"):
-        func = getattr(raw, "function", None)
-        if func and hasattr(func, "name"):
-            return getattr(func, "name", None)
     if isinstance(raw, dict):
         name = raw.get("name")
         if name:
@@ -108,20 +171,19 @@ def _get_tool_name(raw: Any) -> Optional[str]:
         func = raw.get("function", {})
         if isinstance(func, dict):
             return func.get("name")
+        return None
+    name = getattr(raw, "name", _MISSING)
+    if name is not _MISSING:
+        return name
+    func = getattr(raw, "function", None)
+    if func is not None:
+        return getattr(func, "name", None)
     return None
 
 
 def _get_tool_input(raw: Any) -> Any:
     if raw is None:
         return None
-    if hasattr(raw, "arguments"):
-        return getattr(raw, "arguments", None)
-    if hasattr(raw, "input"):
-        return getattr(raw, "input", None)
-    if hasattr(raw, "function"):
-        func = getattr(raw, "function", None)
-        if func and hasattr(func, "arguments"):
-            return getattr(func, "arguments", None)
     if isinstance(raw, dict):
         if "arguments" in raw:
             return raw.get("arguments")
@@ -130,6 +192,16 @@ def _get_tool_input(raw: Any) -> Any:
         func = raw.get("function", {})
         if isinstance(func, dict):
             return func.get("arguments") or func.get("input")
+        return None
+    value = getattr(raw, "arguments", _MISSING)
+    if value is not _MISSING:
+        return value
+    value = getattr(raw, "input", _MISSING)
+    if value is not _MISSING:
+        return value
+    func = getattr(raw, "function", None)
+    if func is not None:
+        return getattr(func, "arguments", None)
     return None
 
 
@@ -143,10 +215,7 @@ def build_executor(
     memory_summary_prompt: str,
     summary_max_chars: int,
 ) -> AgentsExecutor:
-    model_name = config.model.chat or config.model.primary
-    temperature = config.model.temperature
-    if "chat" in model_name:
-        temperature = 1.0
+    model_name, temperature = resolve_model(config)
 
     toolset = AgentsToolset(config.tools)
     agent = Agent(
@@ -157,21 +226,21 @@ def build_executor(
         model_settings=ModelSettings(temperature=temperature),
     )
 
-    max_messages = memory_max_messages
-    if max_messages < 1:
-        max_messages = 1
-    reset_to = memory_reset_to_messages
-    if reset_to < 1 or reset_to > max_messages:
-        reset_to = max_messages
+    # Limits arrive pre-clamped by load_config.
     return AgentsExecutor(
         _config=config,
         agent=agent,
         max_turns=max_turns,
-        _transcript=[],
-        _memory_limit=max_messages,
-        _memory_reset_to=reset_to,
+        _transcript=deque(),
+        _transcript_lines=deque(),
+        _pending_summary_lines=[],
+        _memory_limit=memory_max_messages,
+        _memory_reset_to=memory_reset_to_messages,
         _summary_text="",
         _summary_max_chars=summary_max_chars,
         _memory_summary_prompt=memory_summary_prompt,
         _base_system_prompt=system_prompt,
+        _summary_prefix=f"{system_prompt}\n\n### MEMORY SUMMARY\n",
+        _instructions=system_prompt,
+        _instructions_summary="",
     )
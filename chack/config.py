@@ -1,3 +1,4 @@
+import functools
 import os
 import re
 from dataclasses import dataclass, field
@@ -9,13 +10,17 @@ import yaml
 _ENV_PATTERN = re.compile(r"\$\{([A-Z0-9_]+)\}")
 
 
+def _replace_env(match: re.Match) -> str:
+    return os.environ.get(match.group(1), "")
+
+
 def _interpolate_env(value: Any) -> Any:
     if isinstance(value, str):
-        def _replace(match: re.Match) -> str:
-            var = match.group(1)
-            return os.environ.get(var, "")
-
-        return _ENV_PATTERN.sub(_replace, value)
+        # Most config strings contain no placeholder; the substring check
+        # skips the regex engine (and closure allocation) for those.
+        if "${" not in value:
+            return value
+        return _ENV_PATTERN.sub(_replace_env, value)
     if isinstance(value, list):
         return [_interpolate_env(v) for v in value]
     if isinstance(value, dict):
@@ -53,6 +58,7 @@ class TelegramConfig:
     memory_reset_to_messages: int = 0
     memory_summary_prompt: str = ""
     memory_reset_minutes: int = 30
+    max_active_chats: int = 256
     long_term_memory_enabled: bool = True
     long_term_memory_max_chars: int = 1500
     long_term_memory_dir: str = "longterm"
@@ -70,6 +76,7 @@ class DiscordConfig:
     memory_reset_to_messages: int = 0
     memory_summary_prompt: str = ""
     memory_reset_minutes: int = 30
+    max_active_chats: int = 256
     long_term_memory_enabled: bool = True
     long_term_memory_max_chars: int = 1500
     long_term_memory_dir: str = "longterm"
@@ -130,6 +137,34 @@ class ChackConfig:
     env: Dict[str, str]
 
 
+def resolve_model(config: "ChackConfig", temperature: Optional[float] = None) -> tuple:
+    """Return the effective (model_name, temperature) for an LLM call.
+
+    Prefers model.chat over model.primary. Pass an explicit temperature to
+    override the configured one (e.g. 0.0 for summarization); "chat"-series
+    models only accept the default temperature, so they are forced to 1.0.
+    """
+    model_name = config.model.chat or config.model.primary
+    if temperature is None:
+        temperature = config.model.temperature
+    return model_name, _effective_temperature(model_name, temperature)
+
+
+@functools.lru_cache(maxsize=32)
+def _effective_temperature(model_name: str, temperature: float) -> float:
+    return 1.0 if "chat" in model_name else temperature
+
+
+def _clamp_memory_limits(section) -> None:
+    # Normalize once at load time so executors and memory builders can
+    # trust the values instead of re-clamping on every rebuild.
+    if section.memory_max_messages < 1:
+        section.memory_max_messages = 1
+    reset_to = section.memory_reset_to_messages
+    if reset_to < 1 or reset_to > section.memory_max_messages:
+        section.memory_reset_to_messages = section.memory_max_messages
+
+
 def _load_section(data: Dict[str, Any], key: str, cls):
     section = data.get(key, {})
     if section is None:
@@ -180,6 +215,7 @@ def load_config(path: str) -> ChackConfig:
         ]
 
     telegram = _load_section(raw, "telegram", TelegramConfig)
+    _clamp_memory_limits(telegram)
     # Coerce ID lists to ints when provided as strings.
     telegram.dm_allowlist_ids = [
         int(x) for x in telegram.dm_allowlist_ids if str(x).strip()
@@ -205,6 +241,7 @@ def load_config(path: str) -> ChackConfig:
             )
 
     discord = _load_section(raw, "discord", DiscordConfig)
+    _clamp_memory_limits(discord)
     if discord.system_prompt and "$$TOOLS$$" in discord.system_prompt:
         discord.system_prompt = discord.system_prompt.replace("$$TOOLS$$", _get_tools_text())
     # Coerce channel IDs to ints
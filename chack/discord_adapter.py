@@ -2,7 +2,8 @@ import asyncio
 import logging
 import os
 import time
-from typing import Optional
+from collections import OrderedDict
+from typing import Any, Optional
 
 import discord
 from discord.ext import commands
@@ -11,13 +12,13 @@ from langchain_community.callbacks import get_openai_callback
 from .backends import build_executor
 from .config import ChackConfig
 from .long_term_memory import (
-    build_long_term_memory,
+    abuild_long_term_memory,
     format_messages,
     get_long_term_memory_path,
     load_long_term_memory,
     save_long_term_memory,
 )
-from .pricing import estimate_cost, load_pricing, resolve_pricing_path
+from .pricing import TokenUsage, estimate_cost, load_pricing, resolve_pricing_path
 from .tools import format_tool_steps
 
 
@@ -30,9 +31,34 @@ class DiscordBot(commands.Bot):
         self.config = config
         self.config_path = os.environ.get("CHACK_CONFIG", "./config/chack.yaml")
         self.logger = logging.getLogger("chack.discord")
-        self._executors = {}
+        # LRU of live executors: ordered oldest-touched first, capped by
+        # max_active_chats so idle channels do not hold agents forever.
+        self._executors: "OrderedDict[int, Any]" = OrderedDict()
+        self._max_active_chats = max(1, config.discord.max_active_chats)
         self._last_bot_reply_at = {}
-        self._pricing = load_pricing(resolve_pricing_path())
+        self._pricing = None
+        self._model_name = config.model.chat or config.model.primary
+        self._memory_summary_prompt = (
+            config.discord.memory_summary_prompt
+            or config.telegram.memory_summary_prompt
+        )
+        self._allowed_channels = frozenset(config.discord.channel_ids)
+        # Background long-term-memory flusher; created lazily on first use
+        # because it needs a running event loop.
+        self._ltm_queue: Optional[asyncio.Queue] = None
+        self._ltm_worker = None
+        # Lowercase once here instead of per message in on_message.
+        self._trigger_words = tuple(
+            trigger.lower() for trigger in config.discord.trigger_words
+        )
+
+    @property
+    def pricing(self):
+        # Loaded on first use and cached; startup does not touch the
+        # pricing file and repeated estimates never re-read it.
+        if self._pricing is None:
+            self._pricing = load_pricing(resolve_pricing_path())
+        return self._pricing
 
     async def on_ready(self):
         guild_names = [g.name for g in self.guilds]
@@ -65,7 +91,7 @@ class DiscordBot(commands.Bot):
             channel_id = message.channel.parent_id
 
         # Check if message is from allowed channel
-        if channel_id not in self.config.discord.channel_ids:
+        if channel_id not in self._allowed_channels:
             self.logger.info(
                 "Discord message ignored (channel not allowed). "
                 "channel_id=%s parent_id=%s thread=%s author=%s",
@@ -76,9 +102,16 @@ class DiscordBot(commands.Bot):
             )
             return
 
-        # Check if message contains trigger word
+        # Check if message contains trigger word; without any configured
+        # triggers every message is ignored, so skip the lowercasing too.
+        if not self._trigger_words:
+            self.logger.info(
+                "Discord message ignored (no trigger words configured). channel_id=%s",
+                channel_id,
+            )
+            return
         content_lower = message.content.lower()
-        if not any(trigger.lower() in content_lower for trigger in self.config.discord.trigger_words):
+        if not any(trigger in content_lower for trigger in self._trigger_words):
             self.logger.info(
                 "Discord message ignored (no trigger). channel_id=%s content_len=%s",
                 channel_id,
@@ -109,7 +142,7 @@ class DiscordBot(commands.Bot):
                         await status_msg.delete()
                     except Exception:
                         pass
-                self._last_bot_reply_at[message.channel.id] = time.time()
+                self._last_bot_reply_at[message.channel.id] = time.monotonic()
         except Exception as exc:
             self.logger.exception("Failed to process Discord message")
             try:
@@ -120,23 +153,54 @@ class DiscordBot(commands.Bot):
 
     def _get_executor(self, channel_id: int):
         executor = self._executors.get(channel_id)
-        if executor is None:
-            system_prompt = self._system_prompt_for_channel(channel_id)
-            executor = build_executor(
-                self.config,
-                system_prompt=system_prompt,
-                max_turns=self.config.discord.max_turns,
-                memory_max_messages=self.config.discord.memory_max_messages,
-                memory_reset_to_messages=self.config.discord.memory_reset_to_messages,
-                memory_summary_prompt=(
-                    self.config.discord.memory_summary_prompt
-                    or self.config.telegram.memory_summary_prompt
-                ),
-                summary_max_chars=self.config.discord.long_term_memory_max_chars,
+        if executor is not None:
+            self._executors.move_to_end(channel_id)
+            return executor
+        while len(self._executors) >= self._max_active_chats:
+            old_id, old_executor = self._executors.popitem(last=False)
+            self._last_bot_reply_at.pop(old_id, None)
+            self._evict_executor(old_id, old_executor)
+        system_prompt = self._system_prompt_for_channel(channel_id)
+        min_tools_used = max(0, int(self.config.tools.min_tools_used or 0))
+        if min_tools_used > 0:
+            # Bake the rule into the system prompt so the first call already
+            # honors it, instead of discovering it via retries.
+            system_prompt = (
+                f"{system_prompt}\n\nIMPORTANT: Use at least {min_tools_used} tools "
+                "before your final answer. Always use tools to check for more data, "
+                "confirm actions were performed, or verify assumptions by searching "
+                "the internet."
             )
-            self._executors[channel_id] = executor
+        executor = build_executor(
+            self.config,
+            system_prompt=system_prompt,
+            max_turns=self.config.discord.max_turns,
+            memory_max_messages=self.config.discord.memory_max_messages,
+            memory_reset_to_messages=self.config.discord.memory_reset_to_messages,
+            memory_summary_prompt=self._memory_summary_prompt,
+            summary_max_chars=self.config.discord.long_term_memory_max_chars,
+        )
+        self._executors[channel_id] = executor
         return executor
 
+    def _evict_executor(self, channel_id: int, executor) -> None:
+        # Summarize the evicted channel in the background so its history is
+        # folded into long-term memory before the executor is dropped.
+        if not self.config.discord.long_term_memory_enabled:
+            return
+
+        async def _finalize_evicted():
+            try:
+                messages = await executor.aget_memory_messages()
+                if messages:
+                    await self._flush_long_term_memory(channel_id, format_messages(messages))
+            except Exception:
+                self.logger.exception(
+                    "Failed to finalize evicted channel %s", channel_id
+                )
+
+        asyncio.create_task(_finalize_evicted())
+
     def _system_prompt_for_channel(self, channel_id: int) -> str:
         # Use Discord-specific system prompt if configured, otherwise use main system prompt
         base = self.config.discord.system_prompt if self.config.discord.system_prompt else self.config.system_prompt
@@ -152,46 +216,97 @@ class DiscordBot(commands.Bot):
             return base
         return f"{base}\n\n### LONG TERM MEMORY\n{memory_text}"
 
-    async def _finalize_long_term_memory(self, channel_id: int) -> None:
+    async def _snapshot_conversation(self, channel_id: int) -> str:
         if not self.config.discord.long_term_memory_enabled:
-            return
+            return ""
         executor = self._executors.get(channel_id)
         if executor is None:
-            return
+            return ""
         messages = await executor.aget_memory_messages()
         if not messages:
-            return
+            return ""
+        return format_messages(messages)
+
+    async def _flush_long_term_memory(self, channel_id: int, conversation: str) -> None:
         path = get_long_term_memory_path(
             self.config_path,
             channel_id,
             self.config.discord.long_term_memory_dir,
         )
         previous = load_long_term_memory(path)
-        conversation = format_messages(messages)
         max_chars = self.config.discord.long_term_memory_max_chars
 
-        def _build():
-            summary_prompt = self.config.discord.long_term_memory_summary_prompt
-            if not summary_prompt:
-                summary_prompt = self.config.telegram.long_term_memory_summary_prompt
-            return build_long_term_memory(self.config, conversation, previous, max_chars)
-
-        updated = await asyncio.to_thread(_build)
+        updated = await abuild_long_term_memory(self.config, conversation, previous, max_chars)
         if updated:
             save_long_term_memory(path, updated, max_chars)
 
+    async def _finalize_long_term_memory(self, channel_id: int) -> None:
+        conversation = await self._snapshot_conversation(channel_id)
+        if conversation:
+            await self._flush_long_term_memory(channel_id, conversation)
+
+    async def _queue_finalize(self, channel_id: int) -> None:
+        # Snapshot now, summarize in the background: resets answer the user
+        # immediately instead of waiting out an LLM round trip. The next
+        # executor for this channel may be built before the flush lands, so
+        # its system prompt can briefly miss the newest memory.
+        conversation = await self._snapshot_conversation(channel_id)
+        if not conversation:
+            return
+        if self._ltm_queue is None:
+            self._ltm_queue = asyncio.Queue()
+            self._ltm_worker = asyncio.create_task(self._ltm_flush_worker())
+        self._ltm_queue.put_nowait((channel_id, conversation))
+
+    async def _ltm_flush_worker(self) -> None:
+        last = None
+        while True:
+            item = await self._ltm_queue.get()
+            try:
+                # Back-to-back resets with no new messages enqueue the same
+                # snapshot; only summarize it once.
+                if item != last:
+                    last = item
+                    await self._flush_long_term_memory(*item)
+            except Exception:
+                self.logger.exception(
+                    "Failed to flush long-term memory for channel %s", item[0]
+                )
+            finally:
+                self._ltm_queue.task_done()
+
+    async def _finalize_all_long_term_memory(self) -> None:
+        # Drain queued background flushes first, then one summary call per
+        # live channel; gather lets them overlap, with the semaphore in
+        # long_term_memory bounding in-flight LLM calls.
+        if self._ltm_queue is not None:
+            await self._ltm_queue.join()
+        await asyncio.gather(
+            *(self._finalize_long_term_memory(cid) for cid in list(self._executors))
+        )
+
+    async def close(self) -> None:
+        try:
+            await self._finalize_all_long_term_memory()
+        except Exception:
+            self.logger.exception("Failed to finalize long-term memory on shutdown")
+        await super().close()
+
     async def _run_agent(self, channel_id: int, text: str) -> str:
         reset_minutes = self.config.discord.memory_reset_minutes
         if reset_minutes and reset_minutes > 0:
             last_reply = self._last_bot_reply_at.get(channel_id)
-            if last_reply and (time.time() - last_reply) > reset_minutes * 60:
-                await self._finalize_long_term_memory(channel_id)
+            if last_reply and (time.monotonic() - last_reply) > reset_minutes * 60:
+                await self._queue_finalize(channel_id)
                 self._executors.pop(channel_id, None)
                 self._last_bot_reply_at.pop(channel_id, None)
         
         executor = self._get_executor(channel_id)
         min_tools_used = max(0, int(self.config.tools.min_tools_used or 0))
-        max_attempts = 20
+        # The min-tools rule lives in the system prompt, so the first call
+        # normally satisfies it; allow one reminder retry instead of the old
+        # 20 full agent round trips, and answer best-effort if still unmet.
+        max_attempts = 2
         result = {}
         cb = None
         for attempt in range(max_attempts):
@@ -203,33 +318,30 @@ class DiscordBot(commands.Bot):
                     "assumptions by searching the internet."
                 )
             with get_openai_callback() as attempt_cb:
-                result = await asyncio.to_thread(executor.invoke, {"input": attempt_text})
+                result = await executor.ainvoke({"input": attempt_text})
             cb = attempt_cb
             steps = result.get("intermediate_steps", [])
             if min_tools_used <= 0 or len(steps) >= min_tools_used:
                 break
         else:
-            raise RuntimeError(
-                f"Minimum tool usage requirement not met: {min_tools_used} tools."
+            self.logger.warning(
+                "Minimum tool usage not met (%s of %s tools); returning best-effort answer.",
+                len(result.get("intermediate_steps", [])),
+                min_tools_used,
             )
         
-        prompt_tokens = int(getattr(cb, "prompt_tokens", 0) or 0)
-        completion_tokens = int(getattr(cb, "completion_tokens", 0) or 0)
-        cached_prompt_tokens = int(
-            getattr(cb, "prompt_tokens_cached", getattr(cb, "cached_prompt_tokens", 0)) or 0
-        )
+        usage = TokenUsage.from_callback(cb)
         output = result.get("output", "")
         steps = result.get("intermediate_steps", [])
         max_turns = self.config.discord.max_turns
         rounds_used = len(steps) + 1 if output else len(steps)
         tools_used = len(steps)
-        model_name = self.config.model.chat or self.config.model.primary
         cost = estimate_cost(
-            self._pricing,
-            model_name,
-            prompt_tokens=prompt_tokens,
-            completion_tokens=completion_tokens,
-            cached_prompt_tokens=cached_prompt_tokens,
+            self.pricing,
+            self._model_name,
+            prompt_tokens=usage.prompt_tokens,
+            completion_tokens=usage.completion_tokens,
+            cached_prompt_tokens=usage.cached_prompt_tokens,
         )
         cost_text = f"${cost:.6f}" if cost is not None else "unknown"
         suffix = f"\n\n🔁 {rounds_used}/{max_turns} | 🧰 {tools_used} | 💲 {cost_text}"
@@ -242,20 +354,22 @@ class DiscordBot(commands.Bot):
             return [text]
         
         chunks = []
-        lines = text.splitlines()
         current = []
-        
-        for line in lines:
-            candidate = current + [line]
-            if len("\n".join(candidate)) > limit and current:
+        current_len = 0  # length of "\n".join(current), tracked incrementally
+
+        for line in text.splitlines():
+            candidate_len = current_len + len(line) + (1 if current else 0)
+            if candidate_len > limit and current:
                 chunks.append("\n".join(current))
                 current = [line]
+                current_len = len(line)
             else:
-                current = candidate
-        
+                current.append(line)
+                current_len = candidate_len
+
         if current:
             chunks.append("\n".join(current))
-        
+
         return chunks
 
 
@@ -263,6 +377,16 @@ def run_discord_bot(config: ChackConfig):
     """Run the Discord bot."""
     if not config.discord.token:
         raise RuntimeError("Discord token is not configured.")
-    
+
     bot = DiscordBot(config)
     bot.run(config.discord.token)
+
+
+async def run_discord_bot_async(config: ChackConfig):
+    """Run the Discord bot on the current event loop."""
+    if not config.discord.token:
+        raise RuntimeError("Discord token is not configured.")
+
+    bot = DiscordBot(config)
+    async with bot:
+        await bot.start(config.discord.token)
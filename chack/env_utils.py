@@ -24,28 +24,29 @@ def _write_aws_profiles(credentials) -> Optional[str]:
     creds_path = os.path.join(aws_dir, "credentials")
     config_path = os.path.join(aws_dir, "config")
 
+    creds_sections = []
+    config_sections = []
+    for name, values in profiles.items():
+        if not isinstance(values, dict):
+            continue
+        access_key = values.get("aws_access_key_id", "")
+        secret_key = values.get("aws_secret_access_key", "")
+        if access_key and secret_key:
+            creds_sections.append(
+                f"[{name}]\n"
+                f"aws_access_key_id = {access_key}\n"
+                f"aws_secret_access_key = {secret_key}\n\n"
+            )
+        region = values.get("aws_region", "") or values.get("region", "")
+        if region:
+            profile_name = "default" if name == "default" else f"profile {name}"
+            config_sections.append(f"[{profile_name}]\nregion = {region}\n\n")
+
     with open(creds_path, "w", encoding="utf-8") as handle:
-        for name, values in profiles.items():
-            if not isinstance(values, dict):
-                continue
-            access_key = values.get("aws_access_key_id", "")
-            secret_key = values.get("aws_secret_access_key", "")
-            if not access_key or not secret_key:
-                continue
-            handle.write(f"[{name}]\n")
-            handle.write(f"aws_access_key_id = {access_key}\n")
-            handle.write(f"aws_secret_access_key = {secret_key}\n\n")
+        handle.write("".join(creds_sections))
 
     with open(config_path, "w", encoding="utf-8") as handle:
-        for name, values in profiles.items():
-            if not isinstance(values, dict):
-                continue
-            region = values.get("aws_region", "") or values.get("region", "")
-            if not region:
-                continue
-            profile_name = "default" if name == "default" else f"profile {name}"
-            handle.write(f"[{profile_name}]\n")
-            handle.write(f"region = {region}\n\n")
+        handle.write("".join(config_sections))
 
     return aws_dir
 
@@ -1,13 +1,23 @@
 from __future__ import annotations
 
+import asyncio
+import functools
+import hashlib
 import os
+from collections import OrderedDict
 from typing import Iterable, Optional
 
 from agents import Agent, ModelSettings, Runner
 
-from .config import ChackConfig
+from .config import ChackConfig, resolve_model
 
 
+# Bound on concurrent summarization LLM calls when several chats are
+# finalized at once; keeps memory maintenance from starving chat traffic.
+_LLM_CONCURRENCY = asyncio.Semaphore(4)
+
+
+@functools.lru_cache(maxsize=None)
 def _resolve_dir(config_path: str, rel_dir: str) -> str:
     if os.path.isabs(rel_dir):
         return rel_dir
@@ -15,51 +25,137 @@ def _resolve_dir(config_path: str, rel_dir: str) -> str:
     return os.path.normpath(os.path.join(base_dir, rel_dir))
 
 
+# Directories already created this run; get_long_term_memory_path is called
+# on every executor build, so only hit the filesystem the first time.
+_MADE_DIRS: set[str] = set()
+
+
 def get_long_term_memory_path(config_path: str, chat_id: int, rel_dir: str) -> str:
     directory = _resolve_dir(config_path, rel_dir)
-    os.makedirs(directory, exist_ok=True)
+    if directory not in _MADE_DIRS:
+        os.makedirs(directory, exist_ok=True)
+        _MADE_DIRS.add(directory)
     return os.path.join(directory, f"{chat_id}.txt")
 
 
+# path -> (mtime_ns, size, content); memory files are re-read only when
+# they change on disk, and not at all right after our own saves.
+_MEMORY_CACHE: dict[str, tuple] = {}
+
+
 def load_long_term_memory(path: str) -> str:
-    if not os.path.exists(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
         return ""
+    cached = _MEMORY_CACHE.get(path)
+    if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
     with open(path, "r", encoding="utf-8") as handle:
-        return handle.read().strip()
+        content = handle.read().strip()
+    _MEMORY_CACHE[path] = (stat.st_mtime_ns, stat.st_size, content)
+    return content
 
 
 def save_long_term_memory(path: str, content: str, max_chars: int) -> None:
     if max_chars > 0 and len(content) > max_chars:
         content = content[:max_chars].rstrip()
-    with open(path, "w", encoding="utf-8") as handle:
+    if content == load_long_term_memory(path):
+        return
+    # Write to a sibling temp file and rename so a crash mid-write never
+    # leaves a truncated memory file behind.
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
         handle.write(content)
+    os.replace(tmp_path, path)
+    stat = os.stat(path)
+    _MEMORY_CACHE[path] = (stat.st_mtime_ns, stat.st_size, content.strip())
+
+
+def _format_message(msg) -> str:
+    if isinstance(msg, dict):
+        role = str(msg.get("role") or msg.get("type") or "message").lower()
+        return f"{role}: {msg.get('content', '')}"
+    role = getattr(msg, "type", msg.__class__.__name__).lower()
+    return f"{role}: {getattr(msg, 'content', '')}"
 
 
 def format_messages(messages: Iterable) -> str:
-    lines = []
-    for msg in messages:
-        if isinstance(msg, dict):
-            role = str(msg.get("role") or msg.get("type") or "message").lower()
-            content = msg.get("content", "")
-        else:
-            role = getattr(msg, "type", msg.__class__.__name__).lower()
-            content = getattr(msg, "content", "")
-        lines.append(f"{role}: {content}")
-    return "\n".join(lines).strip()
+    return "\n".join([_format_message(msg) for msg in messages]).strip()
 
 
-def build_long_term_memory(
+# Summarization agents are immutable once built; reuse them across calls
+# instead of constructing a new Agent per summary.
+_AGENT_CACHE: dict[tuple, Agent] = {}
+
+
+def _get_memory_agent(model_name: str, temperature: float, instructions: str) -> Agent:
+    key = (model_name, temperature, instructions)
+    agent = _AGENT_CACHE.get(key)
+    if agent is None:
+        agent = Agent(
+            name="ChackMemory",
+            instructions=instructions,
+            model=model_name,
+            model_settings=ModelSettings(temperature=temperature),
+        )
+        _AGENT_CACHE[key] = agent
+    return agent
+
+
+# Bounded result cache for summarization calls, keyed by a hash of the
+# exact inputs. Re-summarizing an unchanged buffer (e.g. two finalize
+# triggers in a row) is the common repeat case, and an exact match skips
+# the LLM round trip entirely.
+_SUMMARY_CACHE: OrderedDict = OrderedDict()
+_SUMMARY_CACHE_MAX = 128
+
+
+def _summary_cache_key(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8", "replace"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def _summary_cache_get(key: str) -> Optional[str]:
+    value = _SUMMARY_CACHE.get(key)
+    if value is not None:
+        _SUMMARY_CACHE.move_to_end(key)
+    return value
+
+
+def _summary_cache_put(key: str, value: str) -> None:
+    _SUMMARY_CACHE[key] = value
+    _SUMMARY_CACHE.move_to_end(key)
+    while len(_SUMMARY_CACHE) > _SUMMARY_CACHE_MAX:
+        _SUMMARY_CACHE.popitem(last=False)
+
+
+# The prompt templates are config constants and max_chars rarely varies,
+# so the {max_chars} substitution is the same string every call.
+@functools.lru_cache(maxsize=16)
+def _render_prompt(template: str, max_chars: int) -> str:
+    return template.replace("{max_chars}", str(max_chars))
+
+
+def _clip(content: str, max_chars: int) -> str:
+    content = content.strip()
+    if max_chars > 0 and len(content) > max_chars:
+        content = content[:max_chars].rstrip()
+    return content
+
+
+def _long_term_memory_call(
     config: ChackConfig,
     conversation_text: str,
     previous_memory: str,
     max_chars: int,
-) -> str:
-    model_name = config.model.chat or config.model.primary
-    temperature = 0.0
-    if "chat" in model_name:
-        temperature = 1.0
+) -> tuple[Agent, str]:
+    model_name, temperature = resolve_model(config, temperature=0.0)
 
-    system = config.telegram.long_term_memory_summary_prompt.replace("{max_chars}", str(max_chars))
+    system = _render_prompt(config.telegram.long_term_memory_summary_prompt, max_chars)
 
     human = (
         "### Previous memory (if any):\n"
@@ -68,48 +164,113 @@ def build_long_term_memory(
         f"{conversation_text}\n\n"
         "### Write the updated long-term memory now."
     )
-    agent = Agent(
-        name="ChackMemory",
-        instructions=system,
-        model=model_name,
-        model_settings=ModelSettings(temperature=temperature),
-    )
-    result = Runner.run_sync(agent, human)
-    content = getattr(result, "final_output", "") or ""
-    content = content.strip()
-    if max_chars > 0 and len(content) > max_chars:
-        content = content[:max_chars].rstrip()
-    return content
+    return _get_memory_agent(model_name, temperature, system), human
 
 
-def build_memory_summary(
+def _memory_summary_call(
     config: ChackConfig,
     summary_prompt: str,
     conversation_text: str,
     previous_summary: str,
     max_chars: int,
-) -> str:
-    model_name = config.model.chat or config.model.primary
-    temperature = 0.0
-    if "chat" in model_name:
-        temperature = 1.0
+) -> tuple[Agent, str]:
+    model_name, temperature = resolve_model(config, temperature=0.0)
 
     if not summary_prompt or "{summary}" not in summary_prompt or "{new_lines}" not in summary_prompt:
         raise ValueError(
             "memory_summary_prompt must be configured and include {summary} and {new_lines}."
         )
-    prompt = summary_prompt.strip().replace("{max_chars}", str(max_chars))
+    prompt = _render_prompt(summary_prompt.strip(), max_chars)
     human = prompt.format(summary=previous_summary or "None", new_lines=conversation_text)
 
-    agent = Agent(
-        name="ChackMemory",
-        instructions="Update the running summary. Return only the updated summary.",
-        model=model_name,
-        model_settings=ModelSettings(temperature=temperature),
+    agent = _get_memory_agent(
+        model_name,
+        temperature,
+        "Update the running summary. Return only the updated summary.",
     )
+    return agent, human
+
+
+def build_long_term_memory(
+    config: ChackConfig,
+    conversation_text: str,
+    previous_memory: str,
+    max_chars: int,
+) -> str:
+    # Nothing to summarize: keep the previous memory and skip the LLM call.
+    if not conversation_text or not conversation_text.strip():
+        return _clip(previous_memory or "", max_chars)
+    agent, human = _long_term_memory_call(config, conversation_text, previous_memory, max_chars)
+    cache_key = _summary_cache_key(str(agent.model), human)
+    cached = _summary_cache_get(cache_key)
+    if cached is not None:
+        return cached
     result = Runner.run_sync(agent, human)
-    content = getattr(result, "final_output", "") or ""
-    content = content.strip()
-    if max_chars > 0 and len(content) > max_chars:
-        content = content[:max_chars].rstrip()
-    return content
+    memory = _clip(getattr(result, "final_output", "") or "", max_chars)
+    _summary_cache_put(cache_key, memory)
+    return memory
+
+
+async def abuild_long_term_memory(
+    config: ChackConfig,
+    conversation_text: str,
+    previous_memory: str,
+    max_chars: int,
+) -> str:
+    if not conversation_text or not conversation_text.strip():
+        return _clip(previous_memory or "", max_chars)
+    agent, human = _long_term_memory_call(config, conversation_text, previous_memory, max_chars)
+    cache_key = _summary_cache_key(str(agent.model), human)
+    cached = _summary_cache_get(cache_key)
+    if cached is not None:
+        return cached
+    async with _LLM_CONCURRENCY:
+        result = await Runner.run(agent, human)
+    memory = _clip(getattr(result, "final_output", "") or "", max_chars)
+    _summary_cache_put(cache_key, memory)
+    return memory
+
+
+def build_memory_summary(
+    config: ChackConfig,
+    summary_prompt: str,
+    conversation_text: str,
+    previous_summary: str,
+    max_chars: int,
+) -> str:
+    if not conversation_text or not conversation_text.strip():
+        return _clip(previous_summary or "", max_chars)
+    agent, human = _memory_summary_call(
+        config, summary_prompt, conversation_text, previous_summary, max_chars
+    )
+    cache_key = _summary_cache_key(str(agent.model), human)
+    cached = _summary_cache_get(cache_key)
+    if cached is not None:
+        return cached
+    result = Runner.run_sync(agent, human)
+    summary = _clip(getattr(result, "final_output", "") or "", max_chars)
+    _summary_cache_put(cache_key, summary)
+    return summary
+
+
+async def abuild_memory_summary(
+    config: ChackConfig,
+    summary_prompt: str,
+    conversation_text: str,
+    previous_summary: str,
+    max_chars: int,
+) -> str:
+    if not conversation_text or not conversation_text.strip():
+        return _clip(previous_summary or "", max_chars)
+    agent, human = _memory_summary_call(
+        config, summary_prompt, conversation_text, previous_summary, max_chars
+    )
+    cache_key = _summary_cache_key(str(agent.model), human)
+    cached = _summary_cache_get(cache_key)
+    if cached is not None:
+        return cached
+    async with _LLM_CONCURRENCY:
+        result = await Runner.run(agent, human)
+    summary = _clip(getattr(result, "final_output", "") or "", max_chars)
+    _summary_cache_put(cache_key, summary)
+    return summary
@@ -1,11 +1,8 @@
-import asyncio
 import logging
 import os
 
 from .config import load_config
-from .discord_adapter import run_discord_bot
 from .env_utils import export_env
-from .telegram_adapter import TelegramBot
 
 
 def setup_logging(level: str) -> None:
@@ -30,27 +27,33 @@ def main() -> None:
     if not telegram_enabled and not discord_enabled:
         raise RuntimeError("No channels are enabled. Configure telegram.enabled=true or discord.enabled=true.")
 
-    # If both are enabled, we need to run them concurrently
+    # Import each adapter only once we know it is needed: pulling in
+    # python-telegram-bot or discord.py (plus their httpx/langchain
+    # dependencies) for a channel that is disabled just slows startup.
+
+    # If both are enabled, run them as coroutines on one event loop
+    # instead of wrapping each blocking run() in its own thread.
     if telegram_enabled and discord_enabled:
+        import asyncio
+
+        from .discord_adapter import run_discord_bot_async
+        from .telegram_adapter import TelegramBot
+
         async def run_both():
-            telegram_task = asyncio.create_task(asyncio.to_thread(run_telegram))
-            discord_task = asyncio.create_task(asyncio.to_thread(run_discord))
-            await asyncio.gather(telegram_task, discord_task)
-        
-        def run_telegram():
             bot = TelegramBot(config)
-            bot.run()
-        
-        def run_discord():
-            run_discord_bot(config)
-        
+            await asyncio.gather(bot.arun(), run_discord_bot_async(config))
+
         asyncio.run(run_both())
-    
+
     elif telegram_enabled:
+        from .telegram_adapter import TelegramBot
+
         bot = TelegramBot(config)
         bot.run()
-    
+
     elif discord_enabled:
+        from .discord_adapter import run_discord_bot
+
         run_discord_bot(config)
 
 
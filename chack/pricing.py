@@ -7,19 +7,56 @@ from typing import Dict, Optional
 import yaml
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ModelPricing:
+    # Rates are stored per token (the YAML lists USD per 1M tokens; the
+    # division happens once at load so estimate_cost is a plain multiply).
     input: float
     cached_input: float
     output: float
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PricingTable:
     models: Dict[str, ModelPricing]
 
 
+@dataclass
+class TokenUsage:
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_prompt_tokens: int = 0
+
+    @classmethod
+    def from_callback(cls, cb) -> "TokenUsage":
+        """Extract token counts from a langchain callback handler.
+
+        Field names vary between callback versions; this normalizes them
+        to plain ints in one place instead of getattr towers at call sites.
+        """
+        if cb is None:
+            return cls()
+        cached = getattr(cb, "prompt_tokens_cached", None)
+        if cached is None:
+            cached = getattr(cb, "cached_prompt_tokens", 0)
+        return cls(
+            prompt_tokens=int(getattr(cb, "prompt_tokens", 0) or 0),
+            completion_tokens=int(getattr(cb, "completion_tokens", 0) or 0),
+            cached_prompt_tokens=int(cached or 0),
+        )
+
+
+# path -> ((mtime_ns, size), PricingTable); reparsed only when the file
+# on disk actually changes.
+_PRICING_CACHE: Dict[str, tuple] = {}
+
+
 def load_pricing(path: str) -> PricingTable:
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _PRICING_CACHE.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
     with open(path, "r", encoding="utf-8") as handle:
         raw = yaml.safe_load(handle) or {}
     models_raw = raw.get("models", {}) or {}
@@ -29,13 +66,15 @@ def load_pricing(path: str) -> PricingTable:
             continue
         try:
             models[name] = ModelPricing(
-                input=float(values.get("input", 0.0)),
-                cached_input=float(values.get("cached_input", 0.0)),
-                output=float(values.get("output", 0.0)),
+                input=float(values.get("input", 0.0)) / 1_000_000.0,
+                cached_input=float(values.get("cached_input", 0.0)) / 1_000_000.0,
+                output=float(values.get("output", 0.0)) / 1_000_000.0,
             )
         except (TypeError, ValueError):
             continue
-    return PricingTable(models=models)
+    table = PricingTable(models=models)
+    _PRICING_CACHE[path] = (key, table)
+    return table
 
 
 def resolve_pricing_path() -> str:
@@ -49,13 +88,12 @@ def estimate_cost(
     completion_tokens: int,
     cached_prompt_tokens: int = 0,
 ) -> Optional[float]:
-    if model not in pricing.models:
+    rates = pricing.models.get(model)
+    if rates is None:
         return None
-    rates = pricing.models[model]
     billable_prompt = max(prompt_tokens - cached_prompt_tokens, 0)
-    total = (
+    return (
         billable_prompt * rates.input
         + cached_prompt_tokens * rates.cached_input
         + completion_tokens * rates.output
     )
-    return total / 1_000_000.0
@@ -3,7 +3,8 @@ import logging
 import os
 import re
 import time
-from typing import List, Optional
+from collections import OrderedDict
+from typing import Any, List, Optional
 
 from langchain_community.callbacks import get_openai_callback
 from telegram import Update
@@ -19,49 +20,213 @@ from telegram.ext import (
 from .backends import build_executor
 from .config import ChackConfig
 from .long_term_memory import (
-    build_long_term_memory,
+    abuild_long_term_memory,
     format_messages,
     get_long_term_memory_path,
     load_long_term_memory,
     save_long_term_memory,
 )
-from .pricing import estimate_cost, load_pricing, resolve_pricing_path
+from .pricing import TokenUsage, estimate_cost, load_pricing, resolve_pricing_path
 from .tools import format_tool_steps
 
 
+# Markdown-to-HTML patterns, compiled once at import; _markdown_to_html runs
+# for every chunk of every reply.
+_RE_CODEBLOCK = re.compile(r"```(.*?)```", re.DOTALL)
+_RE_HEADER_LINE = re.compile(r"#{1,6}\s+(.+)$")
+_RE_ITALIC_STAR = re.compile(r"\*([^\*\n]+?)\*")
+_RE_ITALIC_UNDER = re.compile(r"\b_([^_\n]+?)_\b")
+# All inline constructs as one alternation, ordered so bold wins over
+# italic; finditer walks the text once instead of one sub() sweep per
+# construct plus placeholder restore passes.
+_RE_MD_INLINE = re.compile(
+    r"`(?P<inline>[^`\n]+?)`"
+    r"|\*\*(?P<bold_star>[^*\n]+?)\*\*"
+    r"|__(?P<bold_under>[^_\n]+?)__"
+    r"|\*(?P<ital_star>[^*\n]+?)\*"
+    r"|\b_(?P<ital_under>[^_\n]+?)_\b"
+    r"|\[(?P<link_text>[^\]]+?)\]\((?P<link_url>[^)]+?)\)"
+)
+
+# Single-pass HTML escaping instead of three chained str.replace scans.
+_HTML_ESCAPE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+
+# The only tags _markdown_to_html emits; anything else in a chunk means
+# the conversion produced something Telegram would reject.
+_RE_TELEGRAM_TAG = re.compile(r"<(/?)(b|i|code|pre|a)(?:\s[^<>]*)?>")
+
+
+def _is_valid_telegram_html(chunk: str) -> bool:
+    """Check that a converted chunk only contains balanced known tags.
+
+    Telegram rejects malformed HTML only after a full network round trip,
+    so validate locally and pick the parse mode before sending instead of
+    paying a wasted request per bad chunk.
+    """
+    stack: List[str] = []
+    pos = 0
+    for match in _RE_TELEGRAM_TAG.finditer(chunk):
+        # Raw "<" between tags means an unescaped or unknown construct.
+        if "<" in chunk[pos : match.start()]:
+            return False
+        pos = match.end()
+        closing, tag = match.group(1), match.group(2)
+        if not closing:
+            stack.append(tag)
+        elif not stack or stack.pop() != tag:
+            return False
+    if "<" in chunk[pos:]:
+        return False
+    return not stack
+
+
+def _convert_emphasis(body: str) -> str:
+    # Bold bodies may still carry nested italics (**a *b* c**).
+    body = body.translate(_HTML_ESCAPE)
+    body = _RE_ITALIC_STAR.sub(r"<i>\1</i>", body)
+    return _RE_ITALIC_UNDER.sub(r"<i>\1</i>", body)
+
+
+def _convert_inline(segment: str) -> str:
+    out = []
+    pos = 0
+    for match in _RE_MD_INLINE.finditer(segment):
+        out.append(segment[pos : match.start()].translate(_HTML_ESCAPE))
+        pos = match.end()
+        inline = match.group("inline")
+        if inline is not None:
+            out.append(f"<code>{inline.translate(_HTML_ESCAPE)}</code>")
+            continue
+        link_text = match.group("link_text")
+        if link_text is not None:
+            url = match.group("link_url").translate(_HTML_ESCAPE)
+            out.append(f'<a href="{url}">{link_text.translate(_HTML_ESCAPE)}</a>')
+            continue
+        bold = match.group("bold_star")
+        if bold is None:
+            bold = match.group("bold_under")
+        if bold is not None:
+            out.append(f"<b>{_convert_emphasis(bold)}</b>")
+            continue
+        italic = match.group("ital_star")
+        if italic is None:
+            italic = match.group("ital_under")
+        out.append(f"<i>{italic.translate(_HTML_ESCAPE)}</i>")
+    out.append(segment[pos:].translate(_HTML_ESCAPE))
+    return "".join(out)
+
+
+def _convert_markdown_span(segment: str) -> str:
+    if not segment:
+        return ""
+    lines = []
+    for line in segment.split("\n"):
+        header = _RE_HEADER_LINE.match(line)
+        if header:
+            lines.append(f"<b>{_convert_inline(header.group(1))}</b>")
+        else:
+            lines.append(_convert_inline(line))
+    return "\n".join(lines)
+
+
+class _PatternList:
+    """Match against a list of compiled patterns, one by one.
+
+    Fallback for pattern lists that cannot be merged into a single union
+    regex; exposes the same search() shape as a compiled pattern.
+    """
+
+    __slots__ = ("_patterns",)
+
+    def __init__(self, patterns: List[re.Pattern]):
+        self._patterns = patterns
+
+    def search(self, text: str):
+        for pattern in self._patterns:
+            match = pattern.search(text)
+            if match:
+                return match
+        return None
+
+
 class TelegramBot:
     def __init__(self, config: ChackConfig):
         self.config = config
         self.config_path = os.environ.get("CHACK_CONFIG", "./config/chack.yaml")
         self.logger = logging.getLogger("chack.telegram")
-        self._executors = {}
+        # LRU of live executors: ordered oldest-touched first, capped by
+        # max_active_chats so idle chats do not hold agents forever.
+        self._executors: "OrderedDict[int, Any]" = OrderedDict()
+        self._max_active_chats = max(1, config.telegram.max_active_chats)
         self._last_bot_reply_at = {}
-        self._pricing = load_pricing(resolve_pricing_path())
-        self.dm_require = self._compile_patterns(config.telegram.dm_require_regex)
-        self.group_require = self._compile_patterns(config.telegram.group_require_regex)
-        self.group_title_allow = self._compile_patterns(config.telegram.group_allowlist_title_regex)
+        self._pricing = None
+        self._model_name = config.model.chat or config.model.primary
+        self.dm_require = self._compile_union(config.telegram.dm_require_regex)
+        self.group_require = self._compile_union(config.telegram.group_require_regex)
+        self.group_title_allow = self._compile_union(config.telegram.group_allowlist_title_regex)
         self.dm_user_allow = set(config.telegram.dm_allowlist_ids)
+        self.group_id_allow = set(config.telegram.group_allowlist_ids)
         self.dm_username_allow = set(
             u.lower() for u in config.telegram.dm_allowlist_usernames
         )
-        self.dm_username_allow_regex = self._compile_patterns(
+        self.dm_username_allow_regex = self._compile_union(
             config.telegram.dm_allowlist_usernames_regex
         )
+        # Background long-term-memory flusher; created lazily on first use
+        # because it needs a running event loop.
+        self._ltm_queue: Optional[asyncio.Queue] = None
+        self._ltm_worker = None
+
+    @property
+    def pricing(self):
+        # Loaded on first use and cached; startup does not touch the
+        # pricing file and repeated estimates never re-read it.
+        if self._pricing is None:
+            self._pricing = load_pricing(resolve_pricing_path())
+        return self._pricing
 
     @staticmethod
-    def _compile_patterns(patterns: List[str]) -> List[re.Pattern]:
-        compiled = []
+    def _compile_union(patterns: List[str]) -> Optional[Any]:
+        """Compile a pattern list into a single matcher.
+
+        One search against the union alternation replaces a Python-level
+        loop over the individual patterns; invalid patterns are skipped as
+        before. Returns None when nothing compiles (no restriction).
+        """
+        valid = []
         for pattern in patterns:
             try:
-                compiled.append(re.compile(pattern, re.IGNORECASE))
+                valid.append((pattern, re.compile(pattern, re.IGNORECASE)))
             except re.error:
                 continue
-        return compiled
+        if not valid:
+            return None
+        # Concatenation renumbers capturing groups, which silently breaks
+        # numbered backreferences — (\w+)-\1 alone matches "xx-xx" but not
+        # once another group precedes it in the union. Patterns with groups
+        # therefore stay out of the union and are matched individually.
+        unionable = [(p, c) for p, c in valid if not c.groups]
+        matchers: List[Any] = [c for _, c in valid if c.groups]
+        if unionable:
+            try:
+                matchers.insert(
+                    0,
+                    re.compile("|".join(f"(?:{p})" for p, _ in unionable), re.IGNORECASE),
+                )
+            except re.error:
+                # Patterns can be valid alone yet reject mid-union — e.g. a
+                # global inline flag like (?i) at a non-start position is a
+                # hard error on Python 3.11. Fall back to matching the
+                # already-compiled patterns one by one.
+                matchers[:0] = [compiled for _, compiled in unionable]
+        if len(matchers) == 1:
+            return matchers[0]
+        return _PatternList(matchers)
 
-    def _matches_any(self, patterns: List[re.Pattern], text: str) -> bool:
-        if not patterns:
+    def _matches_any(self, pattern: Optional[Any], text: str) -> bool:
+        if pattern is None:
             return True
-        return any(pattern.search(text) for pattern in patterns)
+        return bool(pattern.search(text))
 
     def _user_allowed(self, user_id: int, username: Optional[str]) -> bool:
         if not self.dm_user_allow and not self.dm_username_allow and not self.dm_username_allow_regex:
@@ -72,25 +237,25 @@ class TelegramBot:
             uname = username.lower()
             if uname in self.dm_username_allow:
                 return True
-            for pattern in self.dm_username_allow_regex:
-                if pattern.search(uname):
-                    return True
+            if self.dm_username_allow_regex and self.dm_username_allow_regex.search(uname):
+                return True
         return False
 
     def _group_allowed(self, chat_id: int, title: Optional[str]) -> bool:
-        if not self.config.telegram.group_allowlist_ids and not self.group_title_allow:
+        if not self.group_id_allow and not self.group_title_allow:
             return True
-        if chat_id in self.config.telegram.group_allowlist_ids:
+        if chat_id in self.group_id_allow:
             return True
-        if title:
-            return any(pattern.search(title) for pattern in self.group_title_allow)
+        if title and self.group_title_allow:
+            return bool(self.group_title_allow.search(title))
         return False
 
     def _message_allowed(self, update: Update) -> bool:
+        # Cheap boolean/allowlist checks run first; the message text is only
+        # extracted for the final require-regex match.
         message = update.effective_message
         if message is None:
             return False
-        text = message.text or message.caption or ""
         chat = update.effective_chat
         user = update.effective_user
         if chat is None or user is None:
@@ -101,14 +266,18 @@ class TelegramBot:
                 return False
             if not self._user_allowed(user.id, user.username):
                 return False
-            return self._matches_any(self.dm_require, text)
+            if self.dm_require is None:
+                return True
+            return self._matches_any(self.dm_require, message.text or message.caption or "")
 
         if chat.type in (ChatType.GROUP, ChatType.SUPERGROUP):
             if not self.config.telegram.allow_groups:
                 return False
             if not self._group_allowed(chat.id, chat.title or ""):
                 return False
-            return self._matches_any(self.group_require, text)
+            if self.group_require is None:
+                return True
+            return self._matches_any(self.group_require, message.text or message.caption or "")
 
         return False
 
@@ -129,20 +298,54 @@ class TelegramBot:
 
     def _get_executor(self, chat_id: int):
         executor = self._executors.get(chat_id)
-        if executor is None:
-            system_prompt = self._system_prompt_for_chat(chat_id)
-            executor = build_executor(
-                self.config,
-                system_prompt=system_prompt,
-                max_turns=self.config.telegram.max_turns,
-                memory_max_messages=self.config.telegram.memory_max_messages,
-                memory_reset_to_messages=self.config.telegram.memory_reset_to_messages,
-                memory_summary_prompt=self.config.telegram.memory_summary_prompt,
-                summary_max_chars=self.config.telegram.long_term_memory_max_chars,
+        if executor is not None:
+            self._executors.move_to_end(chat_id)
+            return executor
+        while len(self._executors) >= self._max_active_chats:
+            old_id, old_executor = self._executors.popitem(last=False)
+            self._last_bot_reply_at.pop(old_id, None)
+            self._evict_executor(old_id, old_executor)
+        system_prompt = self._system_prompt_for_chat(chat_id)
+        min_tools_used = max(0, int(self.config.tools.min_tools_used or 0))
+        if min_tools_used > 0:
+            # Bake the rule into the system prompt so the first call already
+            # honors it, instead of discovering it via retries.
+            system_prompt = (
+                f"{system_prompt}\n\nIMPORTANT: Use at least {min_tools_used} tools "
+                "before your final answer. Always use tools to check for more data, "
+                "confirm actions were performed, or verify assumptions by searching "
+                "the internet."
             )
-            self._executors[chat_id] = executor
+        executor = build_executor(
+            self.config,
+            system_prompt=system_prompt,
+            max_turns=self.config.telegram.max_turns,
+            memory_max_messages=self.config.telegram.memory_max_messages,
+            memory_reset_to_messages=self.config.telegram.memory_reset_to_messages,
+            memory_summary_prompt=self.config.telegram.memory_summary_prompt,
+            summary_max_chars=self.config.telegram.long_term_memory_max_chars,
+        )
+        self._executors[chat_id] = executor
         return executor
 
+    def _evict_executor(self, chat_id: int, executor) -> None:
+        # Summarize the evicted chat in the background so its history is
+        # folded into long-term memory before the executor is dropped.
+        if not self.config.telegram.long_term_memory_enabled:
+            return
+
+        async def _finalize_evicted():
+            try:
+                messages = await executor.aget_memory_messages()
+                if messages:
+                    await self._flush_long_term_memory(chat_id, format_messages(messages))
+            except Exception:
+                self.logger.exception(
+                    "Failed to finalize evicted chat %s", chat_id
+                )
+
+        asyncio.create_task(_finalize_evicted())
+
     def _system_prompt_for_chat(self, chat_id: int) -> str:
         base = self.config.system_prompt
         if not self.config.telegram.long_term_memory_enabled:
@@ -157,42 +360,89 @@ class TelegramBot:
             return base
         return f"{base}\n\n### LONG TERM MEMORY\n{memory_text}"
 
-    async def _finalize_long_term_memory(self, chat_id: int) -> None:
+    async def _snapshot_conversation(self, chat_id: int) -> str:
         if not self.config.telegram.long_term_memory_enabled:
-            return
+            return ""
         executor = self._executors.get(chat_id)
         if executor is None:
-            return
+            return ""
         messages = await executor.aget_memory_messages()
         if not messages:
-            return
+            return ""
+        return format_messages(messages)
+
+    async def _flush_long_term_memory(self, chat_id: int, conversation: str) -> None:
         path = get_long_term_memory_path(
             self.config_path,
             chat_id,
             self.config.telegram.long_term_memory_dir,
         )
         previous = load_long_term_memory(path)
-        conversation = format_messages(messages)
         max_chars = self.config.telegram.long_term_memory_max_chars
 
-        def _build():
-            return build_long_term_memory(self.config, conversation, previous, max_chars)
-
-        updated = await asyncio.to_thread(_build)
+        updated = await abuild_long_term_memory(self.config, conversation, previous, max_chars)
         if updated:
             save_long_term_memory(path, updated, max_chars)
 
+    async def _finalize_long_term_memory(self, chat_id: int) -> None:
+        conversation = await self._snapshot_conversation(chat_id)
+        if conversation:
+            await self._flush_long_term_memory(chat_id, conversation)
+
+    async def _queue_finalize(self, chat_id: int) -> None:
+        # Snapshot now, summarize in the background: resets answer the user
+        # immediately instead of waiting out an LLM round trip. The next
+        # executor for this chat may be built before the flush lands, so
+        # its system prompt can briefly miss the newest memory.
+        conversation = await self._snapshot_conversation(chat_id)
+        if not conversation:
+            return
+        if self._ltm_queue is None:
+            self._ltm_queue = asyncio.Queue()
+            self._ltm_worker = asyncio.create_task(self._ltm_flush_worker())
+        self._ltm_queue.put_nowait((chat_id, conversation))
+
+    async def _ltm_flush_worker(self) -> None:
+        last = None
+        while True:
+            item = await self._ltm_queue.get()
+            try:
+                # Back-to-back resets with no new messages enqueue the same
+                # snapshot; only summarize it once.
+                if item != last:
+                    last = item
+                    await self._flush_long_term_memory(*item)
+            except Exception:
+                self.logger.exception(
+                    "Failed to flush long-term memory for chat %s", item[0]
+                )
+            finally:
+                self._ltm_queue.task_done()
+
+    async def _finalize_all_long_term_memory(self) -> None:
+        # Drain queued background flushes first, then one summary call per
+        # live chat; gather lets them overlap, with the semaphore in
+        # long_term_memory bounding in-flight LLM calls.
+        if self._ltm_queue is not None:
+            await self._ltm_queue.join()
+        await asyncio.gather(
+            *(self._finalize_long_term_memory(cid) for cid in list(self._executors))
+        )
+
     async def _run_agent(self, chat_id: int, text: str) -> str:
         reset_minutes = self.config.telegram.memory_reset_minutes
         if reset_minutes and reset_minutes > 0:
             last_reply = self._last_bot_reply_at.get(chat_id)
-            if last_reply and (time.time() - last_reply) > reset_minutes * 60:
-                await self._finalize_long_term_memory(chat_id)
+            if last_reply and (time.monotonic() - last_reply) > reset_minutes * 60:
+                await self._queue_finalize(chat_id)
                 self._executors.pop(chat_id, None)
                 self._last_bot_reply_at.pop(chat_id, None)
         executor = self._get_executor(chat_id)
         min_tools_used = max(0, int(self.config.tools.min_tools_used or 0))
-        max_attempts = 20
+        # The min-tools rule lives in the system prompt, so the first call
+        # normally satisfies it; allow one reminder retry instead of the old
+        # 20 full agent round trips, and answer best-effort if still unmet.
+        max_attempts = 2
         result = {}
         cb = None
         for attempt in range(max_attempts):
@@ -204,33 +454,30 @@ class TelegramBot:
                     "assumptions by searching the internet."
                 )
             with get_openai_callback() as attempt_cb:
-                result = await asyncio.to_thread(executor.invoke, {"input": attempt_text})
+                result = await executor.ainvoke({"input": attempt_text})
             cb = attempt_cb
             steps = result.get("intermediate_steps", [])
             if min_tools_used <= 0 or len(steps) >= min_tools_used:
                 break
         else:
-            raise RuntimeError(
-                f"Minimum tool usage requirement not met: {min_tools_used} tools."
+            self.logger.warning(
+                "Minimum tool usage not met (%s of %s tools); returning best-effort answer.",
+                len(result.get("intermediate_steps", [])),
+                min_tools_used,
             )
-        prompt_tokens = int(getattr(cb, "prompt_tokens", 0) or 0)
-        completion_tokens = int(getattr(cb, "completion_tokens", 0) or 0)
-        cached_prompt_tokens = int(
-            getattr(cb, "prompt_tokens_cached", getattr(cb, "cached_prompt_tokens", 0)) or 0
-        )
+        usage = TokenUsage.from_callback(cb)
         output = result.get("output", "")
         steps = result.get("intermediate_steps", [])
         max_turns = self.config.telegram.max_turns
         actions = format_tool_steps(steps, max_turns=max_turns, notify_every=10)
         rounds_used = len(steps) + 1 if output else len(steps)
         tools_used = len(steps)
-        model_name = self.config.model.chat or self.config.model.primary
         cost = estimate_cost(
-            self._pricing,
-            model_name,
-            prompt_tokens=prompt_tokens,
-            completion_tokens=completion_tokens,
-            cached_prompt_tokens=cached_prompt_tokens,
+            self.pricing,
+            self._model_name,
+            prompt_tokens=usage.prompt_tokens,
+            completion_tokens=usage.completion_tokens,
+            cached_prompt_tokens=usage.cached_prompt_tokens,
         )
         cost_text = f"${cost:.6f}" if cost is not None else "unknown"
         suffix = f"\n\n🔁 {rounds_used}/{max_turns} | 🧰 {tools_used} | 💲 {cost_text}"
@@ -249,17 +496,26 @@ class TelegramBot:
             return
         typing_task = None
         try:
+            try:
+                await message.chat.send_action(ChatAction.TYPING)
+            except Exception:
+                pass
             typing_task = asyncio.create_task(self._keep_typing(message.chat))
             reply = await self._run_agent(message.chat.id, text)
             chunks = self._split_for_telegram(reply, limit=3500)
-            for idx, chunk in enumerate(chunks):
+            # Pipeline: while a chunk's send is on the wire, convert the next
+            # chunk's markdown instead of serializing conversion and sends.
+            # Awaiting the previous send before starting the next keeps the
+            # chunks arriving in order.
+            send_task = None
+            for chunk in chunks:
                 html_chunk = self._markdown_to_html(chunk)
-                try:
-                    await message.reply_text(html_chunk, parse_mode="HTML")
-                except Exception:
-                    # Fallback: send without formatting
-                    await message.reply_text(chunk)
-            self._last_bot_reply_at[message.chat.id] = time.time()
+                if send_task is not None:
+                    await send_task
+                send_task = asyncio.create_task(self._send_chunk(message, html_chunk, chunk))
+            if send_task is not None:
+                await send_task
+            self._last_bot_reply_at[message.chat.id] = time.monotonic()
         except Exception as exc:
             self.logger.exception("Failed to process message")
             await message.reply_text("Sorry, I ran into an error while processing that.")
@@ -271,88 +527,91 @@ class TelegramBot:
                 except asyncio.CancelledError:
                     pass
 
+    async def _send_chunk(self, message, html_chunk: str, plain_chunk: str) -> None:
+        if _is_valid_telegram_html(html_chunk):
+            try:
+                await message.reply_text(html_chunk, parse_mode="HTML")
+                return
+            except Exception:
+                # Safety net for rejections the local check cannot see.
+                pass
+        await message.reply_text(plain_chunk)
+
     async def _handle_reset(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         if not self._chat_allowed(update):
             return
         chat = update.effective_chat
         if chat is None:
             return
-        await self._finalize_long_term_memory(chat.id)
+        await self._queue_finalize(chat.id)
         self._executors.pop(chat.id, None)
         self._last_bot_reply_at.pop(chat.id, None)
         message = update.effective_message
         if message:
             await message.reply_text("Conversation reset.")
 
-    def run(self) -> None:
+    def _build_application(self):
         if not self.config.telegram.token:
             raise RuntimeError("Telegram token is not configured.")
         application = ApplicationBuilder().token(self.config.telegram.token).build()
         self._app = application
         application.add_handler(CommandHandler("reset", self._handle_reset))
         application.add_handler(MessageHandler(filters.TEXT | filters.CAPTION, self._handle_message))
+        return application
+
+    def run(self) -> None:
+        application = self._build_application()
         self.logger.info("Starting Telegram bot")
         # Disable signal handlers when running from a background thread.
         application.run_polling(stop_signals=None)
 
+    async def arun(self) -> None:
+        # Polling on the caller's event loop, so Telegram and Discord can
+        # share one loop instead of running in a dedicated thread each.
+        application = self._build_application()
+        self.logger.info("Starting Telegram bot")
+        await application.initialize()
+        await application.start()
+        await application.updater.start_polling()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            try:
+                await self._finalize_all_long_term_memory()
+            except Exception:
+                self.logger.exception("Failed to finalize long-term memory on shutdown")
+            await application.updater.stop()
+            await application.stop()
+            await application.shutdown()
+
     async def _keep_typing(self, chat) -> None:
-        # Telegram typing indicator expires quickly; refresh periodically.
+        # The first indicator is sent inline by _handle_message; this task
+        # only refreshes it for replies that outlive the initial ~5s window,
+        # so short replies cost a single send_action call.
         while True:
+            await asyncio.sleep(4)
             try:
                 await chat.send_action(ChatAction.TYPING)
             except Exception:
                 pass
-            await asyncio.sleep(4)
 
     @staticmethod
     def _markdown_to_html(text: str) -> str:
-        """Convert common markdown to Telegram HTML format."""
-        import re
-        
-        # Protect code blocks first (replace with placeholders that won't match markdown)
-        code_blocks = []
-        def save_code_block(match):
-            code_blocks.append(match.group(1))
-            return f"§§§CODEBLOCK{len(code_blocks)-1}§§§"
-        text = re.sub(r'```(.*?)```', save_code_block, text, flags=re.DOTALL)
-        
-        # Protect inline code
-        inline_codes = []
-        def save_inline_code(match):
-            inline_codes.append(match.group(1))
-            return f"§§§INLINECODE{len(inline_codes)-1}§§§"
-        text = re.sub(r'`([^`\n]+?)`', save_inline_code, text)
-        
-        # Now escape HTML special characters
-        text = text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-        
-        # Convert markdown headers to bold
-        text = re.sub(r'^#{1,6}\s+(.+)$', r'<b>\1</b>', text, flags=re.MULTILINE)
-        
-        # Convert bold: **text** (non-greedy, doesn't cross newlines)
-        text = re.sub(r'\*\*([^\*\n]+?)\*\*', r'<b>\1</b>', text)
-        text = re.sub(r'__([^_\n]+?)__', r'<b>\1</b>', text)
-        
-        # Convert italic: *text* or _text_ (non-greedy, doesn't cross newlines)
-        text = re.sub(r'\*([^\*\n]+?)\*', r'<i>\1</i>', text)
-        text = re.sub(r'\b_([^_\n]+?)_\b', r'<i>\1</i>', text)
-        
-        # Restore inline code
-        for i, code in enumerate(inline_codes):
-            # Escape any HTML that was in the code
-            code_escaped = code.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-            text = text.replace(f"§§§INLINECODE{i}§§§", f"<code>{code_escaped}</code>")
-        
-        # Restore code blocks
-        for i, code in enumerate(code_blocks):
-            # Escape any HTML that was in the code block
-            code_escaped = code.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-            text = text.replace(f"§§§CODEBLOCK{i}§§§", f"<pre>{code_escaped}</pre>")
-        
-        # Convert links: [text](url) to <a href="url">text</a>
-        text = re.sub(r'\[([^\]]+?)\]\(([^\)]+?)\)', r'<a href="\2">\1</a>', text)
-        
-        return text
+        """Convert common markdown to Telegram HTML format in one pass.
+
+        Fenced code blocks are emitted directly as <pre>; everything else
+        goes through the inline tokenizer, which escapes plain spans and
+        converts headers, bold, italic, inline code and links as it walks
+        the text left to right. No placeholder substitution passes needed.
+        """
+        out = []
+        pos = 0
+        for match in _RE_CODEBLOCK.finditer(text):
+            out.append(_convert_markdown_span(text[pos : match.start()]))
+            out.append(f"<pre>{match.group(1).translate(_HTML_ESCAPE)}</pre>")
+            pos = match.end()
+        out.append(_convert_markdown_span(text[pos:]))
+        return "".join(out)
 
     @staticmethod
     def _split_for_telegram(text: str, limit: int = 3500) -> List[str]:
@@ -360,34 +619,40 @@ class TelegramBot:
         lines = text.splitlines()
         chunks: List[str] = []
         current: List[str] = []
+        # Length of "\n".join(current), maintained incrementally so the
+        # loop never joins just to measure.
+        cur_len = 0
         in_code = False
 
         def flush():
-            nonlocal current, in_code
+            nonlocal current, cur_len, in_code
             if not current:
                 return
             if in_code:
                 current.append("```")
             chunks.append("\n".join(current))
-            current = []
             if in_code:
-                current.append("```")
+                current = ["```"]
+                cur_len = 3
+            else:
+                current = []
+                cur_len = 0
 
         for line in lines:
             if line.strip().startswith("```"):
                 in_code = not in_code
-            candidate = current + [line]
-            candidate_len = len("\n".join(candidate))
-            if candidate_len > limit and current:
+            add = len(line) + (1 if current else 0)
+            if cur_len + add > limit and current:
                 flush()
-                candidate = current + [line]
+                add = len(line) + (1 if current else 0)
             # If a single line still too long, split it bluntly.
-            if len("\n".join(candidate)) > limit and not current:
+            if cur_len + add > limit and not current:
                 chunk_size = max(500, limit - 200)
                 for i in range(0, len(line), chunk_size):
                     chunks.append(line[i : i + chunk_size])
                 continue
-            current = candidate
+            current.append(line)
+            cur_len += add
 
         if current:
             if in_code:
@@ -8,22 +8,27 @@ from ..config import ToolsConfig
 from .brave_search import BraveSearchTool
 from .duckduckgo_search import DuckDuckGoTool
 from .formatting import _truncate
+from .registry import get_shared_helper
+
+
+# Parsed once at import, which happens after main() has exported the
+# config env; subprocesses inherit os.environ by default, so no per-call
+# copy is needed either.
+_EXEC_TIMEOUT = int(os.environ.get("CHACK_EXEC_TIMEOUT", "120"))
+_EXEC_MAX_OUTPUT = int(os.environ.get("CHACK_EXEC_MAX_OUTPUT", "4000"))
 
 
 def _exec_command(command: str) -> str:
-    timeout = int(os.environ.get("CHACK_EXEC_TIMEOUT", "120"))
-    max_chars = int(os.environ.get("CHACK_EXEC_MAX_OUTPUT", "4000"))
     result = subprocess.run(
         command,
         shell=True,
         capture_output=True,
         text=True,
-        timeout=timeout,
-        env=os.environ.copy(),
+        timeout=_EXEC_TIMEOUT,
     )
     output = (result.stdout or "") + (result.stderr or "")
     output = output.strip() or "(no output)"
-    return _truncate(output, max_chars)
+    return _truncate(output, _EXEC_MAX_OUTPUT)
 
 
 class AgentsToolset:
@@ -34,14 +39,14 @@ class AgentsToolset:
     @staticmethod
     def _make_duckduckgo_tool(helper: DuckDuckGoTool):
         @function_tool(name_override="duckduckgo_search")
-        def duckduckgo_search(query: str, user_agent: str | None = None) -> str:
+        async def duckduckgo_search(query: str, user_agent: str | None = None) -> str:
             """Search DuckDuckGo and return a short list of results.
 
             Args:
                 query: Search query string.
                 user_agent: Optional custom User-Agent header override (useful to avoid blocks if the tool is not returning results).
             """
-            return helper._duckduckgo_search_impl(query=query, user_agent=user_agent)
+            return await helper._duckduckgo_search_async(query=query, user_agent=user_agent)
 
         return duckduckgo_search
 
@@ -98,11 +103,11 @@ class AgentsToolset:
             tools.append(exec_tool)
 
         if self.config.duckduckgo_enabled:
-            ddg_helper = DuckDuckGoTool(self.config)
+            ddg_helper = get_shared_helper(DuckDuckGoTool, self.config)
             tools.append(self._make_duckduckgo_tool(ddg_helper))
 
         if self.config.brave_enabled:
-            brave_helper = BraveSearchTool(self.config)
+            brave_helper = get_shared_helper(BraveSearchTool, self.config)
             tools.append(self._make_brave_tool(brave_helper))
 
         return tools
@@ -8,6 +8,7 @@ import requests
 from langchain_core.tools import StructuredTool, tool
 
 from ..config import ToolsConfig
+from .registry import get_shared_helper
 
 
 _FRESHNESS_PATTERN = re.compile(r"^\\d{4}-\\d{2}-\\d{2}to\\d{4}-\\d{2}-\\d{2}$")
@@ -119,7 +120,7 @@ class BraveSearchTool:
 
 
 def build_brave_search_tool(config: ToolsConfig) -> StructuredTool:
-    helper = BraveSearchTool(config)
+    helper = get_shared_helper(BraveSearchTool, config)
 
     def _brave_search(
         query: str,
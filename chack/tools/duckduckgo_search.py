@@ -1,17 +1,32 @@
+import threading
+import time
+from collections import OrderedDict
 from html.parser import HTMLParser
 from urllib.parse import quote_plus, urlparse, parse_qs, unquote
 
+import httpx
 import requests
 from langchain_core.tools import StructuredTool, tool
 
 from ..config import ToolsConfig
+from .registry import get_shared_helper
+
+try:
+    # Optional C parser; parsing a DuckDuckGo results page with the pure
+    # Python HTMLParser below is the CPU hot spot of the tool. The stdlib
+    # fallback keeps the tool working when selectolax is not installed.
+    from selectolax.parser import HTMLParser as _SelectolaxParser
+except ImportError:  # pragma: no cover - depends on environment
+    _SelectolaxParser = None
 
 
 class _DuckDuckGoHTMLParser(HTMLParser):
     def __init__(self) -> None:
         super().__init__()
         self.results = []
-        self._current_title = ""
+        # Text nodes arrive fragmented (entity refs split them); collect
+        # parts and join once per link instead of concatenating strings.
+        self._current_title_parts = []
         self._current_url = ""
         self._in_result = False
         self._in_title = False
@@ -21,7 +36,7 @@ class _DuckDuckGoHTMLParser(HTMLParser):
         attrs_dict = dict(attrs)
         if tag == "div" and _has_class(attrs_dict, "result__body"):
             self._in_result = True
-            self._current_title = ""
+            self._current_title_parts = []
             self._current_url = ""
             self._result_depth = 1
         elif self._in_result and tag == "div":
@@ -37,20 +52,21 @@ class _DuckDuckGoHTMLParser(HTMLParser):
             self._result_depth -= 1
             if self._result_depth <= 0:
                 self._in_result = False
-                if self._current_title and self._current_url:
+                title = "".join(self._current_title_parts).strip()
+                if title and self._current_url:
                     self.results.append(
                         {
-                            "title": self._current_title.strip(),
+                            "title": title,
                             "url": _normalize_duckduckgo_url(self._current_url),
                         }
                     )
-                self._current_title = ""
+                self._current_title_parts = []
                 self._current_url = ""
                 self._result_depth = 0
 
     def handle_data(self, data):
         if self._in_title and data:
-            self._current_title += data
+            self._current_title_parts.append(data)
 
 
 def _normalize_duckduckgo_url(url: str) -> str:
@@ -74,13 +90,113 @@ def _has_class(attrs: dict, class_name: str) -> bool:
     return class_name in str(raw).split()
 
 
+def _parse_results(html: str) -> list[dict]:
+    if _SelectolaxParser is not None:
+        results = []
+        for node in _SelectolaxParser(html).css("div.result__body a.result__a"):
+            url = node.attributes.get("href") or ""
+            title = node.text(strip=True)
+            if title and url:
+                results.append({"title": title, "url": _normalize_duckduckgo_url(url)})
+        return results
+    parser = _DuckDuckGoHTMLParser()
+    parser.feed(html)
+    return parser.results
+
+
+_DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/120.0.0.0 Safari/537.36"
+)
+
+
 class DuckDuckGoTool:
+    # Shared across instances and created lazily: an AsyncClient wants a
+    # running event loop, and one pool is enough for the whole process.
+    _async_client: httpx.AsyncClient | None = None
+
+    _CACHE_TTL_SECONDS = 300
+    _CACHE_MAX_ENTRIES = 256
+
     def __init__(self, config: ToolsConfig):
         self.config = config
+        # Recent results keyed by (normalized query, max_results): repeated
+        # queries within the TTL skip both the HTTP round trip and the HTML
+        # parse. LangChain may call from worker threads, hence the lock.
+        self._cache: "OrderedDict[tuple, tuple[float, str]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # Keep-alive session shared across searches: repeated queries reuse
+        # the TCP/TLS connection instead of re-handshaking per call.
+        self._session = requests.Session()
+        self._session.headers.update(
+            {
+                "User-Agent": _DEFAULT_USER_AGENT,
+                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+                "Accept-Language": "en-US,en;q=0.5",
+                "Connection": "keep-alive",
+            }
+        )
+        self._session.mount(
+            "https://",
+            requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8),
+        )
+
+    @classmethod
+    def _get_async_client(cls) -> httpx.AsyncClient:
+        if cls._async_client is None:
+            cls._async_client = httpx.AsyncClient(
+                timeout=20,
+                headers={
+                    "User-Agent": _DEFAULT_USER_AGENT,
+                    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+                    "Accept-Language": "en-US,en;q=0.5",
+                },
+            )
+        return cls._async_client
 
     def search(self, query: str) -> str:
         return self._duckduckgo_search_impl(query=query)
 
+    def _clamped_max_results(self) -> int:
+        max_results = self.config.duckduckgo_max_results
+        if max_results < 1:
+            return 1
+        if max_results > 20:
+            return 20
+        return max_results
+
+    def _cache_get(self, key: tuple) -> str | None:
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            ts, value = entry
+            if time.monotonic() - ts >= self._CACHE_TTL_SECONDS:
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return value
+
+    def _cache_put(self, key: tuple, value: str) -> None:
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic(), value)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._CACHE_MAX_ENTRIES:
+                self._cache.popitem(last=False)
+
+    def _format_results(self, query: str, html: str, max_results: int) -> str:
+        results = _parse_results(html)[:max_results]
+        if not results:
+            return (
+                f"SUCCESS: No DuckDuckGo results found for '{query}'. "
+                "Try a different user_agent."
+            )
+        lines = [f"SUCCESS: DuckDuckGo results for '{query}' (top {len(results)}):"]
+        for idx, result in enumerate(results, start=1):
+            lines.append(f"{idx}. {result['title']} - {result['url']}")
+        return "\n".join(lines)
+
     def _duckduckgo_search_impl(self, query: str, user_agent: str | None = None) -> str:
         """Search DuckDuckGo and return a short list of results.
 
@@ -88,29 +204,25 @@ class DuckDuckGoTool:
             query: Search query string.
             user_agent: Optional custom User-Agent header override (useful to avoid blocks if the tool is not returning results).
         """
-        max_results = self.config.duckduckgo_max_results
         if not query.strip():
             return "ERROR: Query cannot be empty"
-        if max_results < 1:
-            max_results = 1
-        if max_results > 20:
-            max_results = 20
+        max_results = self._clamped_max_results()
+
+        # A custom user_agent is a deliberate fresh retry (e.g. after an
+        # empty result set), so it bypasses the cache.
+        cache_key = (query.strip().lower(), max_results)
+        if not user_agent:
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
 
         search_url = f"https://duckduckgo.com/html/?q={quote_plus(query)}"
-        ua = user_agent or (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/120.0.0.0 Safari/537.36"
-        )
-        headers = {
-            "User-Agent": ua,
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.5",
-            "Connection": "keep-alive",
-        }
+        # The session already carries the default headers; only a custom
+        # User-Agent needs a per-request override.
+        headers = {"User-Agent": user_agent} if user_agent else None
 
         try:
-            response = requests.get(search_url, headers=headers, timeout=20)
+            response = self._session.get(search_url, headers=headers, timeout=20)
             response.raise_for_status()
         except requests.exceptions.Timeout:
             return "ERROR: DuckDuckGo search timed out"
@@ -119,24 +231,44 @@ class DuckDuckGoTool:
         except requests.exceptions.HTTPError as exc:
             return f"ERROR: DuckDuckGo returned HTTP {exc.response.status_code}"
 
-        parser = _DuckDuckGoHTMLParser()
-        parser.feed(response.text)
-        results = parser.results[:max_results]
+        formatted = self._format_results(query, response.text, max_results)
+        if formatted.startswith("SUCCESS: DuckDuckGo results"):
+            self._cache_put(cache_key, formatted)
+        return formatted
 
-        if not results:
-            return (
-                f"SUCCESS: No DuckDuckGo results found for '{query}'. "
-                "Try a different user_agent."
-            )
+    async def _duckduckgo_search_async(self, query: str, user_agent: str | None = None) -> str:
+        """Async twin of _duckduckgo_search_impl for callers on an event loop."""
+        if not query.strip():
+            return "ERROR: Query cannot be empty"
+        max_results = self._clamped_max_results()
 
-        lines = [f"SUCCESS: DuckDuckGo results for '{query}' (top {len(results)}):"]
-        for idx, result in enumerate(results, start=1):
-            lines.append(f"{idx}. {result['title']} - {result['url']}")
-        return "\n".join(lines)
+        cache_key = (query.strip().lower(), max_results)
+        if not user_agent:
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+
+        search_url = f"https://duckduckgo.com/html/?q={quote_plus(query)}"
+        headers = {"User-Agent": user_agent} if user_agent else None
+
+        try:
+            response = await self._get_async_client().get(search_url, headers=headers)
+            response.raise_for_status()
+        except httpx.TimeoutException:
+            return "ERROR: DuckDuckGo search timed out"
+        except httpx.HTTPStatusError as exc:
+            return f"ERROR: DuckDuckGo returned HTTP {exc.response.status_code}"
+        except httpx.TransportError:
+            return "ERROR: Failed to connect to DuckDuckGo"
+
+        formatted = self._format_results(query, response.text, max_results)
+        if formatted.startswith("SUCCESS: DuckDuckGo results"):
+            self._cache_put(cache_key, formatted)
+        return formatted
 
 
 def build_duckduckgo_search_tool(config: ToolsConfig) -> StructuredTool:
-    helper = DuckDuckGoTool(config)
+    helper = get_shared_helper(DuckDuckGoTool, config)
 
     def _duckduckgo_search(query: str, user_agent: str | None = None) -> str:
         """Search DuckDuckGo and return a short list of results.
@@ -147,8 +279,12 @@ def build_duckduckgo_search_tool(config: ToolsConfig) -> StructuredTool:
         """
         return helper._duckduckgo_search_impl(query=query, user_agent=user_agent)
 
+    async def _aduckduckgo_search(query: str, user_agent: str | None = None) -> str:
+        return await helper._duckduckgo_search_async(query=query, user_agent=user_agent)
+
     return StructuredTool.from_function(
         name="duckduckgo_search",
         description=_duckduckgo_search.__doc__ or "Search DuckDuckGo.",
         func=_duckduckgo_search,
+        coroutine=_aduckduckgo_search,
     )
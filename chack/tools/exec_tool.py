@@ -7,19 +7,23 @@ from ..config import ToolsConfig
 from .formatting import _truncate
 
 
+# Parsed once at import, which happens after main() has exported the
+# config env; subprocesses inherit os.environ by default, so no per-call
+# copy is needed either.
+_EXEC_TIMEOUT = int(os.environ.get("CHACK_EXEC_TIMEOUT", "120"))
+_EXEC_MAX_OUTPUT = int(os.environ.get("CHACK_EXEC_MAX_OUTPUT", "4000"))
+
+
 @tool("exec")
 def exec_tool(command: str) -> str:
     """Execute a shell command locally and return combined output."""
-    timeout = int(os.environ.get("CHACK_EXEC_TIMEOUT", "120"))
-    max_chars = int(os.environ.get("CHACK_EXEC_MAX_OUTPUT", "4000"))
     result = subprocess.run(
         command,
         shell=True,
         capture_output=True,
         text=True,
-        timeout=timeout,
-        env=os.environ.copy(),
+        timeout=_EXEC_TIMEOUT,
     )
     output = (result.stdout or "") + (result.stderr or "")
     output = output.strip() or "(no output)"
-    return _truncate(output, max_chars)
+    return _truncate(output, _EXEC_MAX_OUTPUT)
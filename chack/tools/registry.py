@@ -0,0 +1,16 @@
+from ..config import ToolsConfig
+
+
+# Helper instances shared between the LangChain and Agents toolsets, keyed
+# by (class, config identity). One DuckDuckGoTool per config means both
+# backends share its connection pool and any result caches.
+_TOOL_HELPERS: dict = {}
+
+
+def get_shared_helper(cls, config: ToolsConfig):
+    key = (cls, id(config))
+    helper = _TOOL_HELPERS.get(key)
+    if helper is None:
+        helper = cls(config)
+        _TOOL_HELPERS[key] = helper
+    return helper